@@ -1,6 +1,8 @@
 """LangGraph wiring: nodes, edges, conditional gates, and compilation."""
 
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
+from langgraph.graph.state import CompiledStateGraph
 
 from state import AgentState
 from nodes.game_planner import game_planner_node
@@ -8,6 +10,9 @@ from nodes.design_evaluator import design_evaluator_node
 from nodes.game_coder import game_coder_node
 from nodes.implementation_planner import implementation_planner_node
 from nodes.game_player import game_player_node
+from nodes.design_fanout import design_fanout_node
+from nodes.coder_race import coder_race_node
+from utils.config import settings
 
 
 # ── Conditional edge: Design gate ──
@@ -32,28 +37,79 @@ def ship_gate(state: AgentState) -> str:
     return "game_coder"
 
 
-def build_graph():
-    """Construct and compile the multi-agent LangGraph pipeline."""
+_compiled: CompiledStateGraph | None = None
+_checkpointer: BaseCheckpointSaver | None = None
+
+
+def build_graph(checkpointer: BaseCheckpointSaver | None = None) -> CompiledStateGraph:
+    """Construct and compile the multi-agent LangGraph pipeline.
+
+    With settings.design_candidates > 1 the planner/evaluator pair is
+    replaced by the concurrent design fan-out node, and with
+    settings.coder_race the first coding pass races the top two designs.
+    With a checkpointer, state is persisted after every node so runs can
+    be resumed by thread_id.
+    """
     workflow = StateGraph(AgentState)
+    fanout = settings.design_candidates > 1
+    race = fanout and settings.coder_race
 
     # ── Add nodes ──
-    workflow.add_node("game_planner", game_planner_node)
-    workflow.add_node("design_evaluator", design_evaluator_node)
-    workflow.add_node("implementation_planner", implementation_planner_node)
+    if fanout:
+        workflow.add_node("design_fanout", design_fanout_node)
+    else:
+        workflow.add_node("game_planner", game_planner_node)
+        workflow.add_node("design_evaluator", design_evaluator_node)
+
+    if race:
+        workflow.add_node("coder_race", coder_race_node)
+    else:
+        workflow.add_node("implementation_planner", implementation_planner_node)
     
     workflow.add_node("game_coder", game_coder_node)
     workflow.add_node("game_player", game_player_node)
 
     # ── Set entry point ──
-    workflow.set_entry_point("game_planner")
+    workflow.set_entry_point("design_fanout" if fanout else "game_planner")
 
     # ── Linear edges ──
-    workflow.add_edge("game_planner", "design_evaluator")
-    workflow.add_edge("implementation_planner", "game_coder")
+    if not fanout:
+        workflow.add_edge("game_planner", "design_evaluator")
+    if not race:
+        workflow.add_edge("implementation_planner", "game_coder")
     workflow.add_edge("game_coder", "game_player")
 
     # ── Conditional edges ──
-    workflow.add_conditional_edges("design_evaluator", design_gate)
+    design_routes = {
+        "implementation_planner": "coder_race" if race else "implementation_planner",
+        "game_planner": "design_fanout" if fanout else "game_planner",
+    }
+    workflow.add_conditional_edges("design_fanout" if fanout else "design_evaluator", design_gate, design_routes)
     workflow.add_conditional_edges("game_player", ship_gate)
+    if race:
+        workflow.add_conditional_edges("coder_race", ship_gate)
+
+    return workflow.compile(checkpointer=checkpointer)
+
+
+def get_graph() -> CompiledStateGraph:
+    """Return the process-wide compiled graph, compiling it on first use.
+
+    The compiled graph holds no per-run state, so a single instance is
+    shared by every request instead of recompiling on each invocation.
+    """
+    global _compiled
+    if _compiled is None:
+        _compiled = build_graph(_checkpointer)
+    return _compiled
+
+
+def set_checkpointer(checkpointer: BaseCheckpointSaver | None) -> None:
+    """Use checkpointer for the process-wide graph (recompiled on next get_graph())."""
+    global _compiled, _checkpointer
+    _checkpointer = checkpointer
+    _compiled = None
+
 
-    return workflow.compile()
+def get_checkpointer() -> BaseCheckpointSaver | None:
+    return _checkpointer
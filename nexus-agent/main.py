@@ -9,8 +9,9 @@ from pathlib import Path
 from rich.console import Console
 from rich.panel import Panel
 
-from graph import build_graph
+from graph import get_graph
 from state import AgentState
+from tools.browser_pool import browser_pool
 
 console = Console()
 
@@ -66,8 +67,11 @@ async def run(input_path: str, verbose: bool = False) -> None:
         "status": "planning",
     }
 
-    graph = build_graph()
-    final_state = await graph.ainvoke(initial_state)
+    graph = get_graph()
+    try:
+        final_state = await graph.ainvoke(initial_state)
+    finally:
+        await browser_pool.stop()
 
     if final_state.get("game_code"):
         game_path, doc_path = save_output(
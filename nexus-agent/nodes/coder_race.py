@@ -0,0 +1,83 @@
+"""Node 3 (race) - Coder Race: Builds the top two designs concurrently and keeps the first to ship."""
+
+import asyncio
+
+from state import AgentState
+from nodes.implementation_planner import implementation_planner_node
+from nodes.game_coder import game_coder_node
+from nodes.game_player import game_player_node
+from utils.logger import get_logger
+from utils.supabase import update_game
+
+log = get_logger("coder_race")
+
+DESIGN_FIELDS = ("game_type", "template_code", "game_design_doc", "design_feedback", "design_approved")
+
+
+async def _build(state: AgentState, candidate: dict) -> dict:
+    """Run implementation planner → coder → player for one design, without touching Supabase."""
+    racer = {**state, **{k: candidate[k] for k in DESIGN_FIELDS}, "game_id": ""}
+    racer.update(await implementation_planner_node(racer))
+    racer.update(await game_coder_node(racer))
+    racer.update(await game_player_node(racer))
+    return racer
+
+
+async def coder_race_node(state: AgentState) -> dict:
+    """Race the first coding pass on the top two candidate designs.
+
+    The first racer whose playtest ships wins and the other is cancelled.
+    If neither ships, the better-ranked design is kept and goes through
+    the normal coder ↔ player fix loop.
+    """
+    candidates = (state.get("design_candidates") or [])[:2]
+    if not candidates:
+        candidates = [{k: state[k] for k in DESIGN_FIELDS}]
+    log.info(f"[bold green]Node 3 — Coder Race[/bold green] | racing: {[c['game_type'] for c in candidates]}")
+
+    tasks = {asyncio.create_task(_build(state, c)): rank for rank, c in enumerate(candidates)}
+    finished: dict[int, dict] = {}
+    winner = None
+
+    pending = set(tasks)
+    while pending and winner is None:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            rank = tasks[task]
+            if task.exception() is not None:
+                log.warning(f"[green]  ↳ racer {candidates[rank]['game_type']} failed:[/green] {task.exception()}")
+                continue
+            finished[rank] = task.result()
+            if finished[rank]["ship_approved"]:
+                winner = finished[rank]
+                break
+
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    if winner is None:
+        if not finished:
+            raise RuntimeError("All coder racers failed")
+        winner = finished[min(finished)]
+
+    keys = DESIGN_FIELDS + (
+        "implementation_plan", "game_code", "documentation", "playtest_report",
+        "ship_approved", "errors", "code_iteration", "status",
+    )
+    result = {k: winner[k] for k in keys if k in winner}
+
+    verdict = "SHIP" if result["ship_approved"] else "FIX"
+    log.info(f"[bold green]Node 3 — Coder Race[/bold green] | done → winner: {result['game_type']} | verdict: {verdict}")
+
+    # Push the winning racer to Supabase
+    game_id = state.get("game_id")
+    if game_id:
+        update_game(game_id, {
+            "status": result["status"],
+            "html_src": result["game_code"],
+            "design_doc_data": result["game_design_doc"],
+            "errors": result["errors"] or None,
+        })
+
+    return result
@@ -8,6 +8,7 @@ from state import AgentState
 from utils.llm import get_llm, extract_text
 from utils.logger import get_logger
 from utils.debug import dump_debug_state
+from utils.prompt_budget import fit_to_budget
 from utils.prompts import load_prompt, render_template
 from utils.supabase import update_game
 
@@ -24,11 +25,11 @@ async def design_evaluator_node(state: AgentState) -> dict:
 
     system = load_prompt("evaluator_system.md")
     rubric = load_prompt("evaluator_rubric.md")
-    user = render_template("evaluator_user.md", {
+    user = render_template("evaluator_user.md", fit_to_budget("design_evaluator", {
         "game_design_doc": state["game_design_doc"],
         "lesson_plan": json.dumps(state["lesson_plan"], indent=2),
         "rubric": rubric,
-    })
+    }))
 
     llm = get_llm("design_evaluator")
     response = await llm.ainvoke([
@@ -0,0 +1,109 @@
+"""Node 1+2 (fan-out) - Design Fan-out: Plans and evaluates several candidate designs concurrently."""
+
+import asyncio
+import re
+
+from state import AgentState
+from nodes.game_planner import game_planner_node
+from nodes.design_evaluator import design_evaluator_node
+from utils.config import settings
+from utils.logger import get_logger
+from utils.supabase import update_game
+
+log = get_logger("design_fanout")
+
+# Matches rubric scores such as "(4/5)" or "4 / 5"
+SCORE_RE = re.compile(r"(\d(?:\.\d+)?)\s*/\s*5\b")
+
+
+def score_feedback(feedback: str) -> float:
+    """Average the rubric scores found in the evaluator's feedback (0 if none)."""
+    scores = [float(s) for s in SCORE_RE.findall(feedback)]
+    return sum(scores) / len(scores) if scores else 0.0
+
+
+def _candidate_hints(count: int) -> list[str]:
+    """The first candidate is unconstrained; the rest are pinned to distinct game types."""
+    hints = [""]
+    for game_type in settings.design_candidate_types:
+        if len(hints) >= count:
+            break
+        if game_type not in hints:
+            hints.append(game_type)
+    while len(hints) < count:
+        hints.append("")
+    return hints
+
+
+async def _plan_and_evaluate(state: AgentState, hint: str) -> dict:
+    """Run planner → evaluator for one candidate without touching Supabase."""
+    candidate_state = {**state, "game_id": "", "game_type_hint": hint}
+    plan = await game_planner_node(candidate_state)
+    evaluation = await design_evaluator_node({**candidate_state, **plan})
+    return {
+        "game_type": plan["game_type"],
+        "template_code": plan["template_code"],
+        "game_design_doc": plan["game_design_doc"],
+        "design_feedback": evaluation["design_feedback"],
+        "design_approved": evaluation["design_approved"],
+        "score": score_feedback(evaluation["design_feedback"]),
+    }
+
+
+async def design_fanout_node(state: AgentState) -> dict:
+    """Plan K candidate designs concurrently, evaluate each, and keep the best.
+
+    Candidates are ranked by evaluator verdict (PASS first) and then by
+    average rubric score. The full ranking is kept in design_candidates
+    so the coder race can pick up the runner-up.
+    """
+    count = max(1, settings.design_candidates)
+    hints = _candidate_hints(count)
+    log.info(f"[bold cyan]Node 1+2 — Design Fan-out[/bold cyan] | design iteration: {state['design_iteration'] + 1} | candidates: {[h or 'free' for h in hints]}")
+
+    outcomes = await asyncio.gather(
+        *(_plan_and_evaluate(state, hint) for hint in hints),
+        return_exceptions=True,
+    )
+
+    candidates = []
+    for hint, outcome in zip(hints, outcomes):
+        if isinstance(outcome, Exception):
+            log.warning(f"[cyan]  ↳ candidate {hint or 'free'} failed:[/cyan] {outcome}")
+            continue
+        candidates.append(outcome)
+    if not candidates:
+        raise RuntimeError("All design candidates failed")
+
+    candidates.sort(key=lambda c: (c["design_approved"], c["score"]), reverse=True)
+    best = candidates[0]
+
+    for c in candidates:
+        verdict = "PASS" if c["design_approved"] else "REVISE"
+        log.info(f"[cyan]  ↳ {c['game_type']}:[/cyan] {verdict} (avg {c['score']:.2f})")
+
+    result = {
+        "game_type": best["game_type"],
+        "template_code": best["template_code"],
+        "game_design_doc": best["game_design_doc"],
+        "design_feedback": best["design_feedback"],
+        "design_approved": best["design_approved"],
+        "design_candidates": candidates,
+        "design_iteration": state["design_iteration"] + 1,
+        "status": "implementation_planning" if best["design_approved"] else "evaluating",
+    }
+
+    log.info(f"[bold cyan]Node 1+2 — Design Fan-out[/bold cyan] | done → selected: {best['game_type']}")
+
+    # Push the winning design to Supabase
+    game_id = state.get("game_id")
+    if game_id:
+        lesson_title = state["lesson_plan"].get("title", "Untitled")
+        update_game(game_id, {
+            "status": result["status"],
+            "title": f"{lesson_title}: {best['game_type'].replace('_', ' ').title()}",
+            "target_audience": "K12",
+            "design_doc_data": best["game_design_doc"],
+        })
+
+    return result
@@ -1,36 +1,108 @@
 """Node 3 - Game Coder & Documentor: Writes the Kaplay.js game code with documentation."""
 
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, message_chunk_to_message
 
 from state import AgentState
+from utils.config import settings
 from utils.llm import get_llm, extract_text
 from utils.logger import get_logger
+from utils.progress import ThrottledProgress
 from utils.debug import dump_debug_state
+from utils.prompt_budget import fit_to_budget
 from utils.prompts import load_prompt, render_template
+from utils.tool_loop import run_tool_loop
 from tools.kaplay_docs_rag import search_kaplay_docs
+from tools.patch_engine import PatchError, apply_patch
 from utils.supabase import update_game
 
 log = get_logger("game_coder")
 
 TOOLS = [search_kaplay_docs]
-TOOLS_BY_NAME = {t.name: t for t in TOOLS}
 MAX_TOOL_ROUNDS = 5
 
 
-async def game_coder_node(state: AgentState) -> dict:
-    """Generate a complete, single-file Kaplay.js HTML game from the GDD.
+def strip_code_fences(text: str) -> str:
+    """Extract HTML from a (possibly still streaming) markdown-fenced response."""
+    if "```html" in text:
+        text = text.split("```html", 1)[1]
+    elif "```" in text:
+        text = text.split("```", 1)[1]
+    else:
+        return text
+    return text.rsplit("```", 1)[0].strip()
 
-    If in a fix loop (code_iteration > 0), includes the playtest error log
-    and report as revision context.
 
-    The LLM can call the search_kaplay_docs tool to look up Kaplay.js API
-    references while writing or revising code.
+async def _stream_response(llm, messages: list, sink: ThrottledProgress, as_html: bool = True) -> AIMessage:
+    """Stream one model turn, publishing throttled progress as text arrives.
+
+    With as_html, the partial HTML (fences stripped) is included in each
+    progress event; otherwise only the character count is. The payload
+    is only built when the sink will actually publish it, and once more
+    when the stream ends.
     """
-    is_revision = state["code_iteration"] > 0
-    mode = "revision" if is_revision else "initial"
-    log.info(f"[bold green]Node 3 — Game Coder[/bold green] | status: {state.get('status')} | mode: {mode} | code iteration: {state['code_iteration'] + 1}")
+    def fields() -> dict:
+        if as_html:
+            return {"chars": len(text), "html_src": strip_code_fences(text)}
+        return {"chars": len(text)}
+
+    aggregate = None
+    text = ""
+    async for chunk in llm.astream(messages):
+        aggregate = chunk if aggregate is None else aggregate + chunk
+        piece = extract_text(chunk.content)
+        if piece:
+            text += piece
+            if sink.ready():
+                sink.update(**fields())
+    if text:
+        sink.update(force=True, **fields())
+    return message_chunk_to_message(aggregate)
+
+
+async def _run_tool_loop(llm, system: str, user: str, sink: ThrottledProgress, as_html: bool = True) -> str:
+    """Agentic tool-calling loop: let the LLM call tools until it produces a final text response."""
+    messages = [
+        SystemMessage(content=system),
+        HumanMessage(content=user),
+    ]
+
+    response = await run_tool_loop(
+        lambda msgs: _stream_response(llm, msgs, sink, as_html),
+        messages, TOOLS, MAX_TOOL_ROUNDS, color="green",
+    )
+    return extract_text(response.content)
+
+
+async def _revise_with_patch(llm, state: AgentState, sink: ThrottledProgress) -> str | None:
+    """Ask for targeted SEARCH/REPLACE edits and apply them to the current code.
+
+    Returns the patched code, or None if the patch could not be applied
+    (the caller then falls back to full regeneration).
+    """
+    # Own output rules: the full-file instructions in coder_system.md would contradict the edit format
+    system = load_prompt("coder_patch_system.md") + "\n" + load_prompt("coder_kaplay.md")
+    # SEARCH blocks must quote existing_code verbatim, so it is never compacted
+    user = render_template("coder_patch_user.md", fit_to_budget("game_coder", {
+        "game_design_doc": state["game_design_doc"],
+        "existing_code": state["game_code"],
+        "playtest_report": state.get("playtest_report") or "",
+        "errors": "\n".join(state.get("errors", [])),
+    }, protected=("existing_code",)))
+
+    patch_text = await _run_tool_loop(llm, system, user, sink, as_html=False)
+    try:
+        code, applied = apply_patch(state["game_code"], patch_text)
+    except PatchError as e:
+        log.warning(f"[yellow]  ↳ patch rejected:[/yellow] {e} — falling back to full regeneration")
+        return None
 
-    system = load_prompt("coder_system.md")
+    log.info(f"[green]  ↳ applied {applied} edits[/green] ({len(patch_text)} chars of patch)")
+    return code
+
+
+async def _generate_full(llm, state: AgentState, sink: ThrottledProgress) -> str:
+    """Generate (or regenerate) the complete HTML file from the template and plan."""
+    system = load_prompt("coder_system.md") + "\n" + load_prompt("coder_kaplay.md")
 
     context = {
         "game_design_doc": state["game_design_doc"],
@@ -42,35 +114,41 @@ async def game_coder_node(state: AgentState) -> dict:
         "errors": "\n".join(state.get("errors", [])),
         "is_revision": state["code_iteration"] > 0,
     }
-    user = render_template("coder_user.md", context)
+    user = render_template("coder_user.md", fit_to_budget("game_coder", context))
 
-    llm = get_llm("game_coder").bind_tools(TOOLS)
+    # Extract HTML if wrapped in markdown code fences
+    return strip_code_fences(await _run_tool_loop(llm, system, user, sink))
 
-    messages = [
-        SystemMessage(content=system),
-        HumanMessage(content=user),
-    ]
 
-    # Agentic tool-calling loop: let the LLM call tools until it produces a final text response
-    for _ in range(MAX_TOOL_ROUNDS):
-        response: AIMessage = await llm.ainvoke(messages)
-        messages.append(response)
+async def game_coder_node(state: AgentState) -> dict:
+    """Generate a complete, single-file Kaplay.js HTML game from the GDD.
 
-        if not response.tool_calls:
-            break
+    If in a fix loop (code_iteration > 0), includes the playtest error log
+    and report as revision context. With settings.coder_patch_mode the
+    model first returns targeted SEARCH/REPLACE edits that are applied to
+    the existing code; if they do not apply cleanly, the whole file is
+    regenerated instead.
 
-        for call in response.tool_calls:
-            tool_fn = TOOLS_BY_NAME[call["name"]]
-            log.info(f"[green]  ↳ tool call:[/green] {call['name']}({call['args']})")
-            output = await tool_fn.ainvoke(call["args"])
-            messages.append(ToolMessage(content=str(output), tool_call_id=call["id"]))
+    The LLM can call the search_kaplay_docs tool to look up Kaplay.js API
+    references while writing or revising code. The response is streamed,
+    and the partial HTML is published to the progress bus as it arrives.
+    """
+    is_revision = state["code_iteration"] > 0
+    mode = "revision" if is_revision else "initial"
+    log.info(f"[bold green]Node 3 — Game Coder[/bold green] | status: {state.get('status')} | mode: {mode} | code iteration: {state['code_iteration'] + 1}")
 
-    code = extract_text(response.content)
-    # Extract HTML if wrapped in markdown code fences
-    if "```html" in code:
-        code = code.split("```html", 1)[1].rsplit("```", 1)[0].strip()
-    elif "```" in code:
-        code = code.split("```", 1)[1].rsplit("```", 1)[0].strip()
+    llm = get_llm("game_coder").bind_tools(TOOLS)
+    sink = ThrottledProgress(state.get("game_id", ""), "game_coder", settings.coder_progress_interval_s)
+
+    code = None
+    if is_revision and settings.coder_patch_mode and state.get("game_code"):
+        code = await _revise_with_patch(llm, state, sink)
+        mode = "patch" if code is not None else "revision"
+
+    if code is None:
+        code = await _generate_full(llm, state, sink)
+
+    sink.update(force=True, chars=len(code), html_src=code)
 
     result = {
         "game_code": code,
@@ -78,7 +156,7 @@ async def game_coder_node(state: AgentState) -> dict:
         "status": "playtesting",
     }
 
-    log.info(f"[bold green]Node 3 — Game Coder[/bold green] | done → generated {len(code)} chars | status: playtesting")
+    log.info(f"[bold green]Node 3 — Game Coder[/bold green] | done → {mode}: {len(code)} chars | status: playtesting")
     dump_debug_state("game_coder", {**state, **result})
 
     # Save raw HTML for inspection
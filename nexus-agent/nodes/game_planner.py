@@ -2,7 +2,6 @@
 
 import json
 import re
-from pathlib import Path
 
 from langchain_core.messages import SystemMessage, HumanMessage
 
@@ -10,7 +9,8 @@ from state import AgentState
 from utils.llm import get_llm, extract_text
 from utils.logger import get_logger
 from utils.debug import dump_debug_state
-from utils.prompts import load_prompt, render_template
+from utils.prompt_budget import fit_to_budget
+from utils.prompts import load_game_template, load_prompt, render_template
 from utils.supabase import update_game
 
 log = get_logger("game_planner")
@@ -19,7 +19,6 @@ VALID_GAME_TYPES = {
     "beatemup", "breakout", "fighter", "match3", "maze",
     "platformer", "quizrunner", "shootemup", "towerdefense", "typingword",
 }
-TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
 
 
 def _parse_game_type(content: str) -> str:
@@ -36,26 +35,22 @@ def _parse_game_type(content: str) -> str:
     return "platformer"
 
 
-def _load_template(game_type: str) -> str:
-    """Load the HTML template for the given game type."""
-    template_path = TEMPLATES_DIR / f"{game_type}.html"
-    return template_path.read_text()
-
-
 async def game_planner_node(state: AgentState) -> dict:
     """Select the best game template and design an addon feature for the lesson.
 
     If design_feedback exists from a prior evaluator loop, it is included
-    as revision instructions for the LLM.
+    as revision instructions for the LLM. If game_type_hint is set, the
+    planner is asked to use that template.
     """
     iteration = state.get("design_iteration", 0) + 1
     log.info(f"[bold cyan]Node 1 — Game Planner[/bold cyan] | status: {state.get('status')} | design iteration: {iteration}")
 
     system = load_prompt("planner_system.md")
-    user = render_template("planner_user.md", {
+    user = render_template("planner_user.md", fit_to_budget("game_planner", {
         "lesson_plan": json.dumps(state["lesson_plan"], indent=2),
         "prior_feedback": state.get("design_feedback") or "None — first iteration",
-    })
+        "game_type_hint": state.get("game_type_hint") or "",
+    }))
 
     llm = get_llm("game_planner")
     response = await llm.ainvoke([
@@ -66,7 +61,7 @@ async def game_planner_node(state: AgentState) -> dict:
     content = extract_text(response.content)
 
     game_type = _parse_game_type(content)
-    template_code = _load_template(game_type)
+    template_code = load_game_template(game_type)
 
     # Generate a short game title from lesson plan + game type
     lesson_title = state["lesson_plan"].get("title", "Untitled")
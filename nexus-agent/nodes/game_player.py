@@ -1,66 +1,62 @@
 """Node 5 - Game Player & Final Evaluator: Tests and evaluates the generated game."""
 
+import asyncio
 import json
+import re
 
 from langchain_core.messages import SystemMessage, HumanMessage
 
 from state import AgentState
+from utils.config import settings
 from utils.llm import get_llm, extract_text
 from utils.logger import get_logger
 from utils.debug import dump_debug_state
+from utils.prompt_budget import fit_to_budget
 from utils.prompts import load_prompt, render_template
-from tools.puppeteer_runner import run_game_headless
+from tools.html_validator import analyze_game
+from tools.puppeteer_runner import PlaytestResult, run_game_headless
 from utils.supabase import update_game
 
 log = get_logger("game_player")
 
+VERDICT_LINE_RE = re.compile(r"VERDICT\W*(SHIP|FIX)\b")
+VERDICT_WORD_RE = re.compile(r"\b(SHIP|FIX)\b")
 
-async def game_player_node(state: AgentState) -> dict:
-    """Run the game in a headless browser to catch real errors, then
-    pass those results to the LLM for a final evaluation.
-    """
-    log.info(f"[bold red]Node 5 — Game Player[/bold red] | status: {state.get('status')} | code iteration: {state['code_iteration'] + 1}")
 
-    # ── Step 1: Headless browser playtest ──
-    log.info("[bold red]Node 5 — Game Player[/bold red] | running headless browser playtest...")
-    playtest = await run_game_headless(state["game_code"])
-
-    runtime_errors = playtest.errors
-    runtime_summary = playtest.summary
+def _parse_llm_errors(content: str) -> list[str]:
+    """Extract the items the LLM listed under ERRORS:."""
+    if "ERRORS:" not in content.upper():
+        return []
+    error_section = content.upper().split("ERRORS:")[-1].split("\n\n")[0]
+    return [line.strip("- ").strip() for line in error_section.strip().split("\n") if line.strip()]
 
-    log.info(f"[bold red]Node 5 — Game Player[/bold red] | browser: {len(runtime_errors)} errors, {len(playtest.console_warnings)} warnings")
 
-    # ── Step 2: LLM evaluation with runtime results ──
-    system = load_prompt("player_system.md")
-    user = render_template("player_user.md", {
-        "game_code": state["game_code"],
-        "game_design_doc": state["game_design_doc"],
-        "lesson_plan": json.dumps(state["lesson_plan"], indent=2),
-        "runtime_results": runtime_summary,
-    })
-
-    llm = get_llm("game_player")
-    response = await llm.ainvoke([
-        SystemMessage(content=system),
-        HumanMessage(content=user),
-    ])
+def _parse_verdict(reply: str) -> bool:
+    """True if the LLM's own reply ends on SHIP.
 
-    content = extract_text(response.content)
+    Uses the last "VERDICT: SHIP/FIX" line, falling back to the last
+    standalone SHIP or FIX word, so words like "spaceship" never count.
+    """
+    text = reply.upper()
+    verdicts = VERDICT_LINE_RE.findall(text) or VERDICT_WORD_RE.findall(text)
+    return bool(verdicts) and verdicts[-1] == "SHIP"
 
-    # If browser caught real errors, those always count
-    errors = list(runtime_errors)
 
-    # Also extract any LLM-reported errors
-    if "ERRORS:" in content.upper():
-        error_section = content.upper().split("ERRORS:")[-1].split("\n\n")[0]
-        llm_errors = [line.strip("- ").strip() for line in error_section.strip().split("\n") if line.strip()]
-        errors.extend(llm_errors)
+def _runtime_failure_report(playtest: PlaytestResult) -> str:
+    """Playtest report built locally when the browser run alone forces a FIX."""
+    return (
+        "## Runtime Test Results (Headless Browser)\n\n"
+        f"{playtest.summary}\n\n"
+        "The browser run failed (runtime errors or perf thresholds), so the game cannot ship; the LLM review was skipped.\n\n"
+        "ERRORS:\n" + "\n".join(f"- {e}" for e in playtest.failures) + "\n\n"
+        "VERDICT: FIX"
+    )
 
-    # Ship only if no runtime errors and LLM says SHIP
-    approved = len(runtime_errors) == 0 and "SHIP" in content.upper()
 
+def _finish(state: AgentState, report: str, approved: bool, errors: list[str], reason: str) -> dict:
+    """Build the node result, log it and push status to Supabase."""
     result = {
-        "playtest_report": content,
+        "playtest_report": report,
         "ship_approved": approved,
         "errors": errors,
         "code_iteration": state["code_iteration"] + 1,
@@ -68,7 +64,7 @@ async def game_player_node(state: AgentState) -> dict:
     }
 
     verdict = "SHIP" if approved else "FIX"
-    log.info(f"[bold red]Node 5 — Game Player[/bold red] | done → verdict: {verdict} | runtime errors: {len(runtime_errors)} | total errors: {len(errors)}")
+    log.info(f"[bold red]Node 5 — Game Player[/bold red] | done → verdict: {verdict} ({reason}) | total errors: {len(errors)}")
     dump_debug_state("game_player", {**state, **result})
 
     # Push status + errors to Supabase
@@ -83,3 +79,118 @@ async def game_player_node(state: AgentState) -> dict:
         update_game(game_id, update_data)
 
     return result
+
+
+async def _ask(template: str, variables: dict) -> str:
+    system = load_prompt("player_system.md")
+    user = render_template(template, fit_to_budget("game_player", variables))
+
+    llm = get_llm("game_player")
+    response = await llm.ainvoke([
+        SystemMessage(content=system),
+        HumanMessage(content=user),
+    ])
+    return extract_text(response.content)
+
+
+async def _llm_review(state: AgentState, runtime_results: str) -> str:
+    """Ask the evaluator LLM for scores, errors and a SHIP/FIX verdict, given the runtime results."""
+    return await _ask("player_user.md", {
+        "game_code": state["game_code"],
+        "game_design_doc": state["game_design_doc"],
+        "lesson_plan": json.dumps(state["lesson_plan"], indent=2),
+        "runtime_results": runtime_results,
+    })
+
+
+async def _code_review(state: AgentState) -> str:
+    """Phase one of the two-phase player: review the code without runtime results."""
+    return await _ask("player_review_user.md", {
+        "game_code": state["game_code"],
+        "game_design_doc": state["game_design_doc"],
+        "lesson_plan": json.dumps(state["lesson_plan"], indent=2),
+    })
+
+
+async def _merge_review(review: str, playtest: PlaytestResult) -> tuple[str, str]:
+    """Phase two: fold a clean browser run into the code review.
+
+    With no warnings the review's verdict stands and the runtime summary
+    is appended locally; warnings get a short follow-up call that sees
+    only the review and the runtime summary, not the code.
+
+    Returns the full report and the LLM reply whose verdict decides:
+    the follow-up if there was one, else the review.
+    """
+    if not playtest.console_warnings:
+        return f"{review}\n\n## Runtime Test Results (Headless Browser)\n\n{playtest.summary}", review
+
+    followup = await _ask("player_followup_user.md", {
+        "review": review,
+        "runtime_results": playtest.summary,
+    })
+    return f"{review}\n\n## Runtime Follow-up\n\n{playtest.summary}\n\n{followup}", followup
+
+
+async def game_player_node(state: AgentState) -> dict:
+    """Run the game in a headless browser to catch real errors, then
+    pass those results to the LLM for a final evaluation.
+
+    settings.player_eval_policy controls the LLM call:
+    - "always": browser run, then the LLM review, every time.
+    - "short_circuit": skip the LLM when the browser already found
+      errors (including perf threshold breaches); the FIX report is
+      built locally from the PlaytestResult.
+    - "two_phase" (default): a code-only LLM review runs concurrently
+      with the browser run. Browser errors cancel it and FIX as above;
+      otherwise the runtime results are merged into the review (with a
+      short follow-up call only if the browser logged warnings), so an
+      iteration costs about max(browser, LLM).
+    """
+    log.info(f"[bold red]Node 5 — Game Player[/bold red] | status: {state.get('status')} | code iteration: {state['code_iteration'] + 1}")
+
+    # ── Step 0: Static pre-flight — hopeless code goes straight back to the coder ──
+    if settings.static_check_enabled:
+        static = await asyncio.to_thread(analyze_game, state["game_code"])
+        log.info(f"[bold red]Node 5 — Game Player[/bold red] | static check: {len(static.errors)} errors, {len(static.warnings)} warnings ({static.elapsed_ms:.0f} ms)")
+        if not static.passed:
+            return _finish(state, static.summary, False, list(static.errors), "static check")
+
+    policy = settings.player_eval_policy
+    review = None
+    if policy == "two_phase":
+        review = asyncio.create_task(_code_review(state))
+
+    # ── Step 1: Headless browser playtest ──
+    log.info(f"[bold red]Node 5 — Game Player[/bold red] | running headless browser playtest... (policy: {policy})")
+    try:
+        playtest = await run_game_headless(state["game_code"], game_type=state.get("game_type"))
+    except BaseException:
+        if review is not None:
+            review.cancel()
+        raise
+
+    # Runtime errors and perf threshold breaches both block shipping
+    runtime_errors = playtest.failures
+    log.info(f"[bold red]Node 5 — Game Player[/bold red] | browser: {len(playtest.errors)} errors, {len(playtest.console_warnings)} warnings, {len(runtime_errors) - len(playtest.errors)} perf failures")
+
+    # Runtime errors force a FIX no matter what the LLM says
+    if runtime_errors and policy != "always":
+        if review is not None:
+            review.cancel()
+        return _finish(state, _runtime_failure_report(playtest), False, list(runtime_errors), "runtime errors")
+
+    # ── Step 2: LLM evaluation with runtime results ──
+    if review is not None:
+        # The follow-up (if any) has the final say; never the runtime text between
+        content, verdict_reply = await _merge_review(await review, playtest)
+    else:
+        content = verdict_reply = await _llm_review(state, playtest.summary)
+
+    # If browser caught real errors, those always count; also extract any LLM-reported errors
+    errors = list(runtime_errors) + _parse_llm_errors(content)
+
+    # Ship only if no runtime errors and LLM says SHIP
+    approved = len(runtime_errors) == 0 and _parse_verdict(verdict_reply)
+
+    return _finish(state, content, approved, errors, "LLM review")
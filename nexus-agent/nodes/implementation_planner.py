@@ -2,20 +2,21 @@
 
 import json
 
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
+from langchain_core.messages import SystemMessage, HumanMessage
 
 from state import AgentState
-from utils.llm import get_llm
+from utils.llm import get_llm, extract_text
 from utils.logger import get_logger
 from utils.debug import dump_debug_state
+from utils.prompt_budget import fit_to_budget
 from utils.prompts import load_prompt, render_template
+from utils.tool_loop import run_tool_loop
 from tools.kaplay_docs_rag import search_kaplay_docs
 from utils.supabase import update_game
 
 log = get_logger("implementation_planner")
 
 TOOLS = [search_kaplay_docs]
-TOOLS_BY_NAME = {t.name: t for t in TOOLS}
 MAX_TOOL_ROUNDS = 5
 
 
@@ -32,12 +33,12 @@ async def implementation_planner_node(state: AgentState) -> dict:
     log.info("[bold magenta]Node 2.5 — Implementation Planner[/bold magenta] | creating implementation roadmap")
 
     system = load_prompt("impl_planner_system.md")
-    user = render_template("impl_planner_user.md", {
+    user = render_template("impl_planner_user.md", fit_to_budget("implementation_planner", {
         "lesson_plan": json.dumps(state["lesson_plan"], indent=2),
         "game_design_doc": state["game_design_doc"],
         "game_type": state["game_type"],
         "template_code": state["template_code"],
-    })
+    }))
 
     llm = get_llm("implementation_planner").bind_tools(TOOLS)
 
@@ -47,26 +48,8 @@ async def implementation_planner_node(state: AgentState) -> dict:
     ]
 
     # Agentic tool-calling loop: let the LLM call tools until it produces a final text response
-    for _ in range(MAX_TOOL_ROUNDS):
-        response: AIMessage = await llm.ainvoke(messages)
-        messages.append(response)
-
-        if not response.tool_calls:
-            break
-
-        for call in response.tool_calls:
-            tool_fn = TOOLS_BY_NAME[call["name"]]
-            log.info(f"[magenta]  ↳ tool call:[/magenta] {call['name']}({call['args']})")
-            output = await tool_fn.ainvoke(call["args"])
-            messages.append(ToolMessage(content=str(output), tool_call_id=call["id"]))
-
-    # response.content may be a list of content blocks; extract text
-    content = response.content
-    if isinstance(content, list):
-        content = "\n".join(
-            block if isinstance(block, str) else block.get("text", "")
-            for block in content
-        )
+    response = await run_tool_loop(llm.ainvoke, messages, TOOLS, MAX_TOOL_ROUNDS, color="magenta")
+    content = extract_text(response.content)
 
     result = {
         "implementation_plan": content,
@@ -1,20 +1,52 @@
-"""Ingest Kaplay.js MDX documentation into a persistent ChromaDB vector store."""
+"""Ingest Kaplay.js MDX documentation into a persistent ChromaDB vector store.
 
+Ingestion is incremental: a manifest next to the store records a hash
+of every source file and chunk, so a re-run only re-embeds chunks whose
+text changed and deletes chunks that no longer exist. Pass --full to
+drop the collection and rebuild from scratch.
+
+Changed files are chunked in a process pool; chunks stream through a
+bounded queue to a batched embedding stage and then to a batched
+writer, so a full rebuild scales with the number of cores.
+
+Usage:
+    python scripts/createragdb.py [--full] [--workers N]
+"""
+
+import argparse
+import hashlib
+import json
+import queue
 import re
 import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import chromadb
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.lexical_index import INDEX_FILENAME, build_index, save_index
+
 MDX_DOCS_DIR = PROJECT_ROOT / "kaplay_docs" / "en"
 TS_DOCS_DIR = PROJECT_ROOT / "kaplay_docs"
 CHROMA_DIR = PROJECT_ROOT / "data" / "chroma_db"
 COLLECTION_NAME = "kaplay_docs"
+MANIFEST_PATH = CHROMA_DIR / "ingest_manifest.json"
 
 CHUNK_SIZE = 1500  # characters (~375 tokens)
 CHUNK_OVERLAP = 200
 
+# Well under Chroma's max batch size (5461)
+WRITE_BATCH_SIZE = 256
+EMBED_BATCH_SIZE = 64
+# Batches allowed in flight between pipeline stages
+PIPELINE_DEPTH = 4
+
 
 def strip_mdx_frontmatter_and_imports(text: str) -> str:
     """Remove YAML frontmatter and Astro/MDX import lines."""
@@ -70,69 +102,289 @@ def chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVE
     return chunks
 
 
-def ingest():
-    mdx_files = sorted(MDX_DOCS_DIR.rglob("*.mdx"))
-    ts_files = sorted(TS_DOCS_DIR.rglob("*.ts"))
+def _sha(data: str | bytes) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
 
-    if not mdx_files and not ts_files:
-        print(f"No .mdx or .ts files found in {MDX_DOCS_DIR} / {TS_DOCS_DIR}")
-        sys.exit(1)
 
-    print(f"Found {len(mdx_files)} MDX files, {len(ts_files)} TypeScript files")
-
-    CHROMA_DIR.mkdir(parents=True, exist_ok=True)
-    client = chromadb.PersistentClient(path=str(CHROMA_DIR))
+def chunk_mdx_file(mdx_path: Path) -> list[dict]:
+    """Chunk one MDX page into records of id, document and metadata."""
+    raw = mdx_path.read_text(encoding="utf-8")
+    title = extract_title(raw)
+    clean = strip_mdx_frontmatter_and_imports(raw)
+    category = mdx_path.parent.name
+    rel_path = str(mdx_path.relative_to(PROJECT_ROOT))
 
-    # Idempotent: delete and recreate
-    try:
-        client.delete_collection(COLLECTION_NAME)
-    except (ValueError, chromadb.errors.NotFoundError):
-        pass
-    collection = client.create_collection(COLLECTION_NAME)
-
-    all_ids = []
-    all_docs = []
-    all_metas = []
-
-    for mdx_path in mdx_files:
-        raw = mdx_path.read_text(encoding="utf-8")
-        title = extract_title(raw)
-        clean = strip_mdx_frontmatter_and_imports(raw)
-        category = mdx_path.parent.name
-        rel_path = str(mdx_path.relative_to(PROJECT_ROOT))
-
-        chunks = chunk_text(clean)
-        for i, chunk in enumerate(chunks):
-            doc_id = f"{mdx_path.stem}_{i}"
-            all_ids.append(doc_id)
-            all_docs.append(chunk)
-            all_metas.append({
+    return [
+        {
+            "id": f"{mdx_path.stem}_{i}",
+            "document": chunk,
+            "metadata": {
                 "title": title,
                 "category": category,
                 "source": rel_path,
                 "chunk_index": i,
-            })
-
-    for ts_path in ts_files:
-        raw = ts_path.read_text(encoding="utf-8")
-        rel_path = str(ts_path.relative_to(PROJECT_ROOT))
-
-        chunks = chunk_typescript_by_comments(raw)
-        for i, (chunk_text_, title) in enumerate(chunks):
-            doc_id = f"ts_{ts_path.stem}_{i}"
-            all_ids.append(doc_id)
-            all_docs.append(chunk_text_)
-            all_metas.append({
+            },
+        }
+        for i, chunk in enumerate(chunk_text(clean))
+    ]
+
+
+def chunk_ts_file(ts_path: Path) -> list[dict]:
+    """Chunk one TypeScript declaration file into records of id, document and metadata."""
+    raw = ts_path.read_text(encoding="utf-8")
+    rel_path = str(ts_path.relative_to(PROJECT_ROOT))
+
+    return [
+        {
+            "id": f"ts_{ts_path.stem}_{i}",
+            "document": chunk_text_,
+            "metadata": {
                 "title": title,
                 "category": "typescript",
                 "source": rel_path,
                 "chunk_index": i,
-            })
+            },
+        }
+        for i, (chunk_text_, title) in enumerate(chunk_typescript_by_comments(raw))
+    ]
+
+
+def load_manifest() -> dict:
+    """Manifest shape: {"files": {rel_path: {"sha": ..., "chunks": {chunk_id: sha}}}}."""
+    if MANIFEST_PATH.exists():
+        return json.loads(MANIFEST_PATH.read_text())
+    return {"files": {}}
+
+
+def save_manifest(manifest: dict) -> None:
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+
+
+def _chunk_source(path: Path, kind: str) -> list[tuple[dict, str]]:
+    """Process-pool worker: chunk one file and hash each chunk."""
+    chunker = chunk_mdx_file if kind == "mdx" else chunk_ts_file
+    return [
+        (record, _sha(record["document"] + json.dumps(record["metadata"], sort_keys=True)))
+        for record in chunker(path)
+    ]
+
+
+@dataclass
+class PipelineStats:
+    chunks: int = 0
+    chunk_s: float = 0.0
+    embed_ms: list[float] = field(default_factory=list)
+    write_ms: list[float] = field(default_factory=list)
+
+    def report(self, elapsed_s: float) -> str:
+        def summary(ms: list[float]) -> str:
+            return f"{sum(ms) / len(ms):.0f} ms avg, {max(ms):.0f} ms max" if ms else "n/a"
+
+        rate = self.chunks / elapsed_s if elapsed_s else 0.0
+        return (
+            f"Pipeline: {self.chunks} chunks in {elapsed_s:.2f}s ({rate:.0f} chunks/s) | "
+            f"chunking {self.chunk_s:.2f}s | embed/batch {summary(self.embed_ms)} | "
+            f"write/batch {summary(self.write_ms)}"
+        )
+
+
+def _put(q: queue.Queue, item, stages: list[Future]) -> None:
+    """Blocking put that gives up if a downstream stage has died."""
+    while True:
+        try:
+            q.put(item, timeout=0.5)
+            return
+        except queue.Full:
+            for stage in stages:
+                if stage.done():
+                    stage.result()  # re-raise the stage's exception
+                    raise RuntimeError("Ingest pipeline stage exited early")
+
+
+def _embed_stage(in_q: queue.Queue, out_q: queue.Queue, embed_fn, stats: PipelineStats, downstream: list[Future]) -> None:
+    """Group records into batches and embed each batch in one call."""
+    batch: list[dict] = []
+
+    def flush():
+        start = time.perf_counter()
+        embeddings = embed_fn([r["document"] for r in batch])
+        stats.embed_ms.append((time.perf_counter() - start) * 1000)
+        _put(out_q, (list(batch), embeddings), downstream)
+        batch.clear()
+
+    try:
+        while (record := in_q.get()) is not None:
+            batch.append(record)
+            if len(batch) >= EMBED_BATCH_SIZE:
+                flush()
+        if batch:
+            flush()
+    finally:
+        # Always release the writer, or a failed embed leaves it blocked on get() forever
+        try:
+            _put(out_q, None, downstream)
+        except Exception:
+            pass  # the writer already died; its error surfaces from writer.result()
+
+
+def _write_stage(in_q: queue.Queue, collection, stats: PipelineStats) -> None:
+    """Upsert embedded records in batches of WRITE_BATCH_SIZE, printing progress."""
+    records: list[dict] = []
+    embeddings: list = []
+    written = 0
+
+    def flush():
+        nonlocal written
+        start = time.perf_counter()
+        collection.upsert(
+            ids=[r["id"] for r in records],
+            embeddings=embeddings,
+            documents=[r["document"] for r in records],
+            metadatas=[r["metadata"] for r in records],
+        )
+        stats.write_ms.append((time.perf_counter() - start) * 1000)
+        written += len(records)
+        print(f"  upserted {written} chunks")
+        records.clear()
+        embeddings.clear()
+
+    while (item := in_q.get()) is not None:
+        records.extend(item[0])
+        embeddings.extend(item[1])
+        if len(records) >= WRITE_BATCH_SIZE:
+            flush()
+    if records:
+        flush()
+
+
+def build_lexical_index(collection) -> None:
+    """Rebuild the BM25 index and types.ts symbol table from every stored chunk."""
+    start = time.perf_counter()
+    stored = collection.get(include=["documents", "metadatas"])
+    version = (collection.metadata or {}).get("version")
+    index = build_index(stored["ids"], stored["documents"], stored["metadatas"], version)
+    save_index(index, CHROMA_DIR)
+    print(
+        f"Lexical index: {len(index['ids'])} chunks, {len(index['postings'])} terms, "
+        f"{len(index['symbols'])} symbols in {time.perf_counter() - start:.2f}s"
+    )
+
+
+def delete_batches(collection, ids: list[str]) -> None:
+    for start in range(0, len(ids), WRITE_BATCH_SIZE):
+        collection.delete(ids=ids[start:start + WRITE_BATCH_SIZE])
+    if ids:
+        print(f"  deleted {len(ids)} stale chunks")
+
+
+def ingest(full: bool = False, workers: int | None = None):
+    mdx_files = sorted(MDX_DOCS_DIR.rglob("*.mdx"))
+    ts_files = sorted(TS_DOCS_DIR.rglob("*.ts"))
 
-    # ChromaDB batch limit is 5461
-    collection.add(ids=all_ids, documents=all_docs, metadatas=all_metas)
-    print(f"Ingested {len(all_ids)} chunks from {len(mdx_files)} MDX + {len(ts_files)} TS files into '{COLLECTION_NAME}'")
+    if not mdx_files and not ts_files:
+        print(f"No .mdx or .ts files found in {MDX_DOCS_DIR} / {TS_DOCS_DIR}")
+        sys.exit(1)
+
+    print(f"Found {len(mdx_files)} MDX files, {len(ts_files)} TypeScript files")
+
+    CHROMA_DIR.mkdir(parents=True, exist_ok=True)
+    client = chromadb.PersistentClient(path=str(CHROMA_DIR))
+
+    collection = None
+    if not full:
+        try:
+            collection = client.get_collection(COLLECTION_NAME)
+        except (ValueError, chromadb.errors.NotFoundError):
+            print(f"Collection '{COLLECTION_NAME}' not found; doing a full build")
+
+    if collection is None:
+        try:
+            client.delete_collection(COLLECTION_NAME)
+        except (ValueError, chromadb.errors.NotFoundError):
+            pass
+        collection = client.create_collection(COLLECTION_NAME)
+        manifest = {"files": {}}
+    else:
+        manifest = load_manifest()
+
+    old_files = manifest["files"]
+    new_files = {}
+    to_delete: list[str] = []
+
+    # Unchanged files are skipped on their hash alone, without chunking
+    changed: list[tuple[Path, str, str]] = []
+    sources = [(p, "mdx") for p in mdx_files] + [(p, "ts") for p in ts_files]
+    for path, kind in sources:
+        rel_path = str(path.relative_to(PROJECT_ROOT))
+        file_sha = _sha(path.read_bytes())
+        previous = old_files.get(rel_path)
+        if previous and previous["sha"] == file_sha:
+            new_files[rel_path] = previous
+        else:
+            changed.append((path, kind, file_sha))
+
+    print(f"{len(sources) - len(changed)} files unchanged, {len(changed)} to chunk")
+
+    # chunk (process pool) → embed queue → embed stage → write queue → write stage
+    stats = PipelineStats()
+    embed_q: queue.Queue = queue.Queue(maxsize=EMBED_BATCH_SIZE * PIPELINE_DEPTH)
+    write_q: queue.Queue = queue.Queue(maxsize=PIPELINE_DEPTH)
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=2) as stage_pool:
+        writer = stage_pool.submit(_write_stage, write_q, collection, stats)
+        embedder = stage_pool.submit(_embed_stage, embed_q, write_q, DefaultEmbeddingFunction(), stats, [writer])
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as chunk_pool:
+                futures = {
+                    chunk_pool.submit(_chunk_source, path, kind): (path, file_sha)
+                    for path, kind, file_sha in changed
+                }
+                for future in as_completed(futures):
+                    path, file_sha = futures[future]
+                    rel_path = str(path.relative_to(PROJECT_ROOT))
+                    previous = old_files.get(rel_path)
+                    old_chunks = previous["chunks"] if previous else {}
+
+                    chunks = {}
+                    for record, chunk_sha in future.result():
+                        chunks[record["id"]] = chunk_sha
+                        if old_chunks.get(record["id"]) != chunk_sha:
+                            stats.chunks += 1
+                            _put(embed_q, record, [embedder, writer])
+                    to_delete.extend(cid for cid in old_chunks if cid not in chunks)
+                    new_files[rel_path] = {"sha": file_sha, "chunks": chunks}
+            stats.chunk_s = time.perf_counter() - started
+        finally:
+            _put(embed_q, None, [embedder, writer])
+        embedder.result()
+        writer.result()
+
+    # Source files that disappeared
+    for rel_path, previous in old_files.items():
+        if rel_path not in new_files:
+            to_delete.extend(previous["chunks"])
+    delete_batches(collection, to_delete)
+
+    if stats.chunks or to_delete:
+        # The version stamp lets search_kaplay_docs drop cached results after a re-ingest
+        collection.modify(metadata={"version": str(time.time_ns())})
+    save_manifest({"files": new_files})
+
+    index_path = CHROMA_DIR / INDEX_FILENAME
+    if stats.chunks or to_delete or not index_path.exists():
+        build_lexical_index(collection)
+
+    total_chunks = sum(len(f["chunks"]) for f in new_files.values())
+    print(stats.report(time.perf_counter() - started))
+    print(f"Collection '{COLLECTION_NAME}' holds {total_chunks} chunks from {len(mdx_files)} MDX + {len(ts_files)} TS files")
 
 
 if __name__ == "__main__":
-    ingest()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--full", action="store_true", help="drop the collection and rebuild from scratch")
+    parser.add_argument("--workers", type=int, default=None, help="chunking processes (default: CPU count)")
+    args = parser.parse_args()
+    ingest(full=args.full, workers=args.workers)
@@ -5,7 +5,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from tools.kaplay_docs_rag import search_kaplay_docs
+from tools.kaplay_docs_rag import search_kaplay_docs_batch
 
 SAMPLE_QUERIES = [
     "how to add a sprite",
@@ -21,10 +21,9 @@ OUTPUT_FILE = Path(__file__).resolve().parent.parent / "output" / ".debug" / "ra
 def main():
     queries = [" ".join(sys.argv[1:])] if len(sys.argv) > 1 else SAMPLE_QUERIES
 
+    print(f"Querying {len(queries)} queries in one batch")
     lines = []
-    for q in queries:
-        print(f"Querying: {q}")
-        result = search_kaplay_docs.invoke(q)
+    for q, result in zip(queries, search_kaplay_docs_batch(queries)):
         lines.append(f"# Query: {q}\n\n{result}\n\n")
 
     OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
@@ -1,24 +1,92 @@
 """FastAPI server for the Kaplay game generator."""
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
 import asyncio
+import json
 import os
+import time
 from pathlib import Path
 from rich.console import Console
 
 from dotenv import load_dotenv
 load_dotenv(".env.local")
 
-from graph import build_graph
+from graph import get_checkpointer, get_graph, set_checkpointer
 from state import AgentState
-from utils.supabase import update_game
+from tools.browser_pool import browser_pool
+from tools.kaplay_docs_rag import query_cache as rag_cache, warm_up as warm_up_docs
+from utils.config import settings
+from utils.jobs import JobConflictError, JobQueue, QueueFullError
+from utils.llm import response_cache, warm_up_llms
+from utils.checkpoint import close_checkpointer, open_checkpointer, thread_config
+from utils.llm_cache import bypass_cache
+from utils.progress import TERMINAL_EVENTS, progress
+from utils.prompts import registry as prompt_registry
+from utils.supabase import update_game, writer as supabase_writer
 
-app = FastAPI(title="Kaplay Game Generator API")
 console = Console()
 
+jobs = JobQueue(
+    concurrency=settings.job_concurrency,
+    max_queued=settings.job_queue_size,
+    max_history=settings.job_history_size,
+)
+
+
+# Startup warm-up state reported by /health
+readiness = {"docs": "warming", "error": None, "attempts": 0}
+
+
+async def _warm_up_docs():
+    """Warm the docs collection, retrying with backoff so a transient failure doesn't stick."""
+    delay = settings.rag_warmup_backoff_s
+    while True:
+        readiness["attempts"] += 1
+        try:
+            await asyncio.to_thread(warm_up_docs)
+        except Exception as e:
+            readiness["docs"] = "retrying"
+            readiness["error"] = f"Docs warm-up failed: {e} (retrying in {delay:g}s)"
+            console.print(f"[yellow]{readiness['error']}[/yellow]")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.rag_warmup_max_backoff_s)
+            continue
+        readiness["docs"] = "ready"
+        readiness["error"] = None
+        return
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load prompts, compile the graph and create LLM clients before the first request
+    prompt_registry.load()
+    checkpointer = None
+    if settings.checkpoint_enabled:
+        checkpointer = await open_checkpointer(settings.checkpoint_path)
+        set_checkpointer(checkpointer)
+    get_graph()
+    warm_up_llms()
+    await browser_pool.start()
+    await supabase_writer.start()
+    await jobs.start()
+    # Load Chroma and the embedding model in the background; /health reports 503 until done
+    warm_task = asyncio.create_task(_warm_up_docs())
+    yield
+    warm_task.cancel()
+    await jobs.stop()
+    await browser_pool.stop()
+    # Drain queued status writes last so updates from cancelled jobs still land
+    await supabase_writer.stop()
+    if checkpointer is not None:
+        await close_checkpointer(checkpointer)
+
+
+app = FastAPI(title="Kaplay Game Generator API", lifespan=lifespan)
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -36,6 +104,7 @@ class LessonPlanRequest(BaseModel):
     user_id: str
     id: str  # UUID of the games row in Supabase
     conversation_id: Optional[str] = None
+    no_cache: bool = False  # Skip the LLM response cache for this run
 
 class GenerateResponse(BaseModel):
     success: bool
@@ -43,8 +112,28 @@ class GenerateResponse(BaseModel):
     status: str
     errors: list[str]
 
+class JobAcceptedResponse(BaseModel):
+    job_id: str
+    game_id: str
+    status: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    game_id: str
+    status: str
+    result: Optional[GenerateResponse] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+def check_auth(authorization: Optional[str]) -> None:
+    """Reject requests that do not carry the shared API key."""
+    if authorization != f"Bearer {API_KEY}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
 async def generate_game(lesson_plan: dict, game_id: str) -> dict:
-    """Run the LangGraph agent to generate a game."""
+    """Run the LangGraph agent to generate a game from scratch."""
     title = lesson_plan.get("title", "untitled")
 
     console.print(f"[cyan]Generating game for: {title} (game_id: {game_id})[/cyan]")
@@ -69,24 +158,99 @@ async def generate_game(lesson_plan: dict, game_id: str) -> dict:
         "status": "planning",
     }
 
-    graph = build_graph()
-    final_state = await graph.ainvoke(initial_state)
+    # A fresh generation discards checkpoints left by an earlier run of this game
+    checkpointer = get_checkpointer()
+    if checkpointer is not None:
+        await checkpointer.adelete_thread(game_id)
 
-    return final_state
+    return await run_graph_with_events(initial_state, game_id)
 
-@app.post("/api/generate", response_model=GenerateResponse)
-async def generate_kaplay_game(
-    request: LessonPlanRequest,
-    authorization: str = Header(None)
-):
-    """Generate a Kaplay game from a lesson plan."""
+async def resume_game(game_id: str) -> dict:
+    """Continue an interrupted run from its last completed node."""
+    console.print(f"[cyan]Resuming game {game_id} from checkpoint[/cyan]")
+    return await run_graph_with_events(None, game_id)
 
-    # API key authentication
-    if authorization != f"Bearer {API_KEY}":
-        raise HTTPException(status_code=401, detail="Unauthorized")
+GATES = {"design_gate", "ship_gate"}
+SSE_KEEPALIVE_S = 15
+
+async def run_graph_with_events(graph_input: dict | None, game_id: str) -> dict:
+    """Run the compiled graph, publishing node and gate transitions to the progress bus.
+
+    With checkpointing enabled the run is keyed by game_id, and a
+    graph_input of None resumes from the last checkpoint. The thread's
+    checkpoints are dropped once the graph reaches END.
+    """
+    graph = get_graph()
+    config = thread_config(game_id) if get_checkpointer() is not None else None
+    if graph_input is None:
+        state = dict((await graph.aget_state(config)).values)
+    else:
+        state = dict(graph_input)
+    started: dict[str, float] = {}
+    gate_routes: dict[str, list[tuple[str, str]]] = {}
+    final_state = state
+
+    async for event in graph.astream_events(graph_input, config=config, version="v2"):
+        kind = event["event"]
+        name = event["name"]
+        node = event.get("metadata", {}).get("langgraph_node")
+
+        if kind == "on_chain_start" and name == node:
+            started[node] = time.monotonic()
+            progress.publish(game_id, {
+                "type": "node_start",
+                "node": node,
+                "step": event["metadata"].get("langgraph_step"),
+                "design_iteration": state.get("design_iteration", 0),
+                "code_iteration": state.get("code_iteration", 0),
+            })
 
+        elif kind == "on_chain_end" and name == node:
+            update = event["data"].get("output") or {}
+            if isinstance(update, dict):
+                state.update(update)
+            duration = time.monotonic() - started.pop(node, time.monotonic())
+            progress.publish(game_id, {
+                "type": "node_end",
+                "node": node,
+                "duration_ms": int(duration * 1000),
+                "status": state.get("status"),
+                "design_iteration": state.get("design_iteration", 0),
+                "code_iteration": state.get("code_iteration", 0),
+            })
+            # Gates run inside their source node, so report them once its update is merged
+            for gate, route in gate_routes.pop(node, []):
+                progress.publish(game_id, {
+                    "type": "gate",
+                    "gate": gate,
+                    "node": node,
+                    "route": route,
+                    "design_approved": state.get("design_approved"),
+                    "ship_approved": state.get("ship_approved"),
+                })
+
+        elif kind == "on_chain_end" and name in GATES:
+            gate_routes.setdefault(node, []).append((name, event["data"].get("output")))
+
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            # Root graph run finished: its output is the final state
+            final_state = event["data"].get("output") or state
+
+    if config is not None:
+        await get_checkpointer().adelete_thread(game_id)
+
+    return final_state
+
+async def run_generation_job(lesson_plan: dict | None, game_id: str, no_cache: bool = False) -> GenerateResponse:
+    """Background job body: run (or, without a lesson plan, resume) the graph and persist the final result."""
+    progress.publish(game_id, {"type": "start", "resumed": lesson_plan is None})
+    run = generate_game(lesson_plan, game_id) if lesson_plan is not None else resume_game(game_id)
     try:
-        final_state = await generate_game(request.lesson_plan, request.id)
+        if no_cache:
+            with bypass_cache():
+                final_state = await run
+        else:
+            final_state = await run
 
         status = final_state.get("status", "unknown")
         errors = final_state.get("errors", [])
@@ -98,31 +262,152 @@ async def generate_kaplay_game(
             "design_doc_data": final_state.get("game_design_doc", ""),
             "errors": errors if errors else None,
         }
-        update_game(request.id, final_data)
+        update_game(game_id, final_data)
+        progress.publish(game_id, {"type": "done", "status": status, "errors": errors})
 
         return GenerateResponse(
             success=status == "done",
-            game_id=request.id,
+            game_id=game_id,
             status=status,
             errors=errors,
         )
 
     except Exception as e:
         console.print(f"[red]Error generating game: {str(e)}[/red]")
+        progress.publish(game_id, {"type": "failed", "status": "failed", "errors": [str(e)]})
         # Mark the game as failed in Supabase
         try:
-            update_game(request.id, {
+            update_game(game_id, {
                 "status": "failed",
                 "errors": [str(e)],
             })
         except Exception:
             pass
-        raise HTTPException(status_code=500, detail=str(e))
+        raise
+
+def announce_job(job) -> None:
+    """Start the game's event history afresh once its job is accepted.
+
+    Done at submit time rather than when a worker picks the job up, so a
+    client that opens /events right after the 202 never replays the
+    previous run's terminal event.
+    """
+    progress.reset(job.game_id)
+    progress.publish(job.game_id, {"type": "queued", "job_id": job.id})
+
+@app.post("/api/generate", response_model=JobAcceptedResponse, status_code=202)
+async def generate_kaplay_game(
+    request: LessonPlanRequest,
+    authorization: str = Header(None)
+):
+    """Queue a Kaplay game generation job and return its handle immediately."""
+    check_auth(authorization)
+
+    try:
+        job = jobs.submit(
+            request.id,
+            lambda: run_generation_job(request.lesson_plan, request.id, request.no_cache),
+        )
+    except JobConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    announce_job(job)
+    return JobAcceptedResponse(job_id=job.id, game_id=job.game_id, status=job.status)
+
+@app.post("/api/generate/{game_id}/resume", response_model=JobAcceptedResponse, status_code=202)
+async def resume_kaplay_game(game_id: str, authorization: str = Header(None)):
+    """Queue a job that resumes an interrupted generation from its last checkpoint."""
+    check_auth(authorization)
+
+    if get_checkpointer() is None:
+        raise HTTPException(status_code=400, detail="Checkpointing is disabled")
+    # A live run keeps snapshot.next non-empty; don't start a second one on its thread
+    active = jobs.active(game_id)
+    if active is not None:
+        raise HTTPException(status_code=409, detail=f"Game {game_id} already has a {active.status} job ({active.id})")
+    snapshot = await get_graph().aget_state(thread_config(game_id))
+    if not snapshot.values:
+        raise HTTPException(status_code=404, detail="No checkpoint for this game")
+    if not snapshot.next:
+        raise HTTPException(status_code=409, detail="Generation already finished")
+
+    try:
+        job = jobs.submit(game_id, lambda: run_generation_job(None, game_id))
+    except JobConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    announce_job(job)
+    update_game(game_id, {"status": snapshot.values.get("status", "planning"), "errors": None})
+    return JobAcceptedResponse(job_id=job.id, game_id=job.game_id, status=job.status)
+
+@app.get("/api/generate/{game_id}/events")
+async def stream_game_events(game_id: str, authorization: str = Header(None)):
+    """Server-Sent Events stream of node transitions, gate verdicts, and coder progress.
+
+    Events already published for the current run are replayed first. The
+    stream ends after the terminal ``done`` or ``failed`` event.
+    """
+    check_auth(authorization)
+
+    async def event_stream():
+        with progress.subscribe(game_id) as subscription:
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=SSE_KEEPALIVE_S)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+                if event["type"] in TERMINAL_EVENTS:
+                    break
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str, authorization: str = Header(None)):
+    """Return the status, and once finished the result, of a generation job."""
+    check_auth(authorization)
+
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobStatusResponse(**job.to_dict())
+
+@app.delete("/api/jobs/{job_id}", response_model=JobStatusResponse)
+async def cancel_job(job_id: str, authorization: str = Header(None)):
+    """Cancel a queued or running generation job."""
+    check_auth(authorization)
+
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.cancel_requested:
+        update_game(job.game_id, {"status": "failed", "errors": ["Cancelled"]})
+        progress.publish(job.game_id, {"type": "failed", "status": "failed", "errors": ["Cancelled"]})
+    return JobStatusResponse(**job.to_dict())
 
 @app.get("/health")
 async def health():
-    """Health check endpoint."""
-    return {"status": "healthy"}
+    """Health check endpoint. Returns 503 until the docs warm-up has finished."""
+    body = {
+        "status": "healthy" if readiness["docs"] == "ready" else "unavailable",
+        "readiness": readiness,
+        "jobs": {"running": jobs.running, "pending": jobs.pending},
+        "browsers": browser_pool.status(),
+        "llm_cache": response_cache.metrics(),
+        "rag_cache": rag_cache.stats(),
+    }
+    if readiness["docs"] != "ready":
+        return JSONResponse(status_code=503, content=body)
+    return body
 
 if __name__ == "__main__":
     import uvicorn
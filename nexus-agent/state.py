@@ -6,7 +6,8 @@ class AgentState(TypedDict):
     lesson_plan: dict              # The raw JSON lesson plan
     game_id: str                   # UUID of the games row in Supabase
 
-    # ── Game Planner output ──
+    # ── Game Planner input/output ──
+    game_type_hint: str            # Optional template the planner is asked to use
     game_type: str                 # One of: beatemup, fighter, maze, platformer, shootemup
     template_code: str             # The base HTML template for the chosen game type
     game_design_doc: str           # Game type choice rationale + addon feature description
@@ -14,6 +15,7 @@ class AgentState(TypedDict):
     # ── Design Evaluator output ──
     design_feedback: str           # Structured critique
     design_approved: bool          # Gate signal
+    design_candidates: list[dict]  # Ranked designs from the fan-out planner (best first)
     
     # ── Implementation Planner output ──
     implementation_plan: str           # Detailed todo list & implementation roadmap
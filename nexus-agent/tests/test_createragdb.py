@@ -0,0 +1,37 @@
+"""Test that a failing ingest pipeline stage surfaces its error instead of hanging."""
+
+import threading
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import createragdb
+
+
+class FailingEmbedding:
+    def __call__(self, input):
+        raise RuntimeError("embedding model unavailable")
+
+
+def test_embed_failure_fails_fast(tmp_path, monkeypatch):
+    monkeypatch.setattr(createragdb, "DefaultEmbeddingFunction", FailingEmbedding)
+    monkeypatch.setattr(createragdb, "MDX_DOCS_DIR", createragdb.PROJECT_ROOT / "kaplay_docs" / "en" / "concepts")
+    monkeypatch.setattr(createragdb, "TS_DOCS_DIR", tmp_path / "no_ts")
+    monkeypatch.setattr(createragdb, "CHROMA_DIR", tmp_path / "chroma")
+    monkeypatch.setattr(createragdb, "MANIFEST_PATH", tmp_path / "chroma" / "ingest_manifest.json")
+
+    errors = []
+
+    def run():
+        try:
+            createragdb.ingest(full=True, workers=1)
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=60)
+
+    assert not thread.is_alive(), "ingest hung after the embed stage failed"
+    assert errors and "embedding model unavailable" in str(errors[0])
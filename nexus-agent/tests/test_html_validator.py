@@ -0,0 +1,60 @@
+"""Test the static pre-flight checks run before the browser playtest."""
+
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.html_validator import analyze_game
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+MAZE = (TEMPLATES_DIR / "maze.html").read_text()
+
+
+def test_templates_pass():
+    for path in sorted(TEMPLATES_DIR.glob("*.html")):
+        report = analyze_game(path.read_text())
+        assert report.passed, f"{path.name}: {report.errors}"
+
+
+def test_truncated_file_is_rejected():
+    report = analyze_game(MAZE[: len(MAZE) // 2])
+    assert not report.passed
+    assert any("truncated" in e for e in report.errors)
+
+
+def test_syntax_error_reports_html_line():
+    report = analyze_game(MAZE.replace("kaplay({", "kaplay({{", 1))
+    line = MAZE[: MAZE.index("kaplay({")].count("\n") + 1
+    assert report.passed
+    assert f"Script 1, line {line}: possible syntax error — Unexpected token {{; left to the browser run" in report.warnings
+
+
+def test_modern_syntax_and_browser_globals_pass():
+    extra = """
+class Mover { speed = 100; #hidden = 1; static count = 0; }
+try { JSON.parse("{"); } catch { }
+const big = 1_000_000 + Number(10n);
+const dark = matchMedia("(prefers-color-scheme: dark)").matches;
+addEventListener("resize", () => { throw RangeError("size"); });
+const name = user?.name ?? "player";
+</script>
+</body>"""
+    report = analyze_game(MAZE.replace("</script>\n</body>", extra, 1))
+    assert report.passed, report.errors
+
+
+def test_import_bindings_are_declared():
+    module = '<script type="module">\nimport { clamp } from "./util.js";\nclamp(1, 0, 2);\n</script>\n</body>'
+    report = analyze_game(MAZE.replace("</body>", module, 1))
+    assert report.passed and not any("clamp()" in w for w in report.warnings)
+
+
+def test_unknown_kaplay_calls_are_flagged():
+    game = MAZE.replace('go("', 'goTo("', 1)
+    report = analyze_game(game)
+    assert report.passed
+    assert any("goTo()" in w for w in report.warnings)
+
+    game = MAZE.replace("kaplay({", "const k = kaplay({", 1).replace("</script>\n</body>", "k.addSprite(1);\n</script>\n</body>")
+    assert any("k.addSprite()" in e for e in analyze_game(game).errors)
@@ -0,0 +1,82 @@
+"""Test the search/replace patch engine used for coder revisions."""
+
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from tools.patch_engine import PatchError, apply_patch, parse_patch
+
+SAMPLE_GAME = """\
+<!DOCTYPE html>
+<html>
+<body>
+    <script src="https://unpkg.com/kaplay@3001.0.19/dist/kaplay.js"></script>
+    <script>
+        kaplay({ width: 800, height: 480 });
+        scene("game", () => {
+            const player = add([rect(32, 32), pos(40, 40), area()]);
+            onKeyDown("left", () => player.move(-200, 0));
+        });
+        go("game");
+    </script>
+</body>
+</html>
+"""
+
+
+def block(search: str, replace: str) -> str:
+    return f"<<<<<<< SEARCH\n{search}=======\n{replace}>>>>>>> REPLACE\n"
+
+
+def test_exact_edit_is_applied():
+    patch = block(
+        '            onKeyDown("left", () => player.move(-200, 0));\n',
+        '            onKeyDown("left", () => player.move(-200, 0));\n'
+        '            onKeyDown("right", () => player.move(200, 0));\n',
+    )
+    patched, applied = apply_patch(SAMPLE_GAME, patch)
+    assert applied == 1
+    assert 'onKeyDown("right"' in patched
+    assert patched.count("onKeyDown") == 2
+
+
+def test_indentation_insensitive_match():
+    patch = block('go("game");\n', 'go("menu");\n')
+    patched, _ = apply_patch(SAMPLE_GAME, patch)
+    assert 'go("menu");' in patched
+    assert 'go("game");' not in patched
+
+
+def test_multiple_blocks_and_deletion():
+    patch = (
+        block("        kaplay({ width: 800, height: 480 });\n", "        kaplay({ width: 640, height: 480 });\n")
+        + block('            onKeyDown("left", () => player.move(-200, 0));\n', "")
+    )
+    patched, applied = apply_patch(SAMPLE_GAME, patch)
+    assert applied == 2
+    assert "width: 640" in patched
+    assert "onKeyDown" not in patched
+
+
+def test_missing_search_fails():
+    with pytest.raises(PatchError, match="not found"):
+        apply_patch(SAMPLE_GAME, block("const enemy = add([]);\n", "const enemy = null;\n"))
+
+
+def test_ambiguous_search_fails():
+    game = SAMPLE_GAME.replace('go("game");', 'go("game");\n        go("game");')
+    with pytest.raises(PatchError, match="matches 2 places"):
+        apply_patch(game, block('        go("game");\n', '        go("menu");\n'))
+
+
+def test_patch_that_breaks_structure_is_rejected():
+    with pytest.raises(PatchError, match="Unbalanced script tags"):
+        apply_patch(SAMPLE_GAME, block("    </script>\n", ""))
+
+
+def test_response_without_blocks_is_rejected():
+    with pytest.raises(PatchError):
+        parse_patch("```html\n<!DOCTYPE html>...\n```")
@@ -0,0 +1,50 @@
+"""Test prompt budget compaction."""
+
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.prompt_budget import compact, fit_to_budget
+
+PLAN = """## Step 1
+Add the player.
+
+```js
+add([
+    pos(0, 0),
+]);
+```
+
+## Step 2
+Add the enemy.
+Add the enemy.
+
+```js
+add([
+    pos(0, 0),
+]);
+```
+"""
+
+
+def test_dedupe_keeps_code_blocks():
+    text = compact("implementation_plan", PLAN)
+    assert text.count("```") == 4
+    assert text.count("pos(0, 0),") == 2
+    assert text.count("Add the enemy.") == 1
+
+
+def test_code_is_stripped_but_never_truncated():
+    code = "<script>\n// comment\n" + "const x = 1;\n" * 2000 + "</script>"
+    out = fit_to_budget("game_player", {"game_code": code, "lesson_plan": "{}" + " " * 4000}, budget=1000)
+    assert "omitted" not in out["game_code"]
+    assert "// comment" not in out["game_code"]
+    assert out["game_code"].endswith("</script>")
+    assert len(out["lesson_plan"]) < 100
+
+
+def test_protected_sections_are_untouched():
+    code = "// keep me\n" + "x();\n" * 2000
+    out = fit_to_budget("game_coder", {"existing_code": code}, budget=100, protected=("existing_code",))
+    assert out["existing_code"] == code
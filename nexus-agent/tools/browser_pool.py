@@ -0,0 +1,190 @@
+"""Long-lived headless Chromium pool shared by all playtests.
+
+Launching Chromium costs about a second and a few hundred MB per
+playtest, so the pool keeps a small number of browsers alive and hands
+out a fresh, isolated BrowserContext for each run. Browsers are
+recycled after a fixed number of uses, and replaced if they crash.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+from utils.config import settings
+from utils.logger import get_logger
+
+log = get_logger("browser_pool")
+
+
+@dataclass
+class _Slot:
+    """One pooled browser and its usage counters."""
+    browser: Browser | None = None
+    uses: int = 0
+    active: int = 0
+
+    @property
+    def healthy(self) -> bool:
+        return self.browser is not None and self.browser.is_connected()
+
+
+class BrowserPool:
+    """Pool of headless Chromium browsers with a cap on concurrent pages.
+
+    Args:
+        size: Number of browser processes kept alive.
+        max_pages: Maximum number of playtest contexts open at once.
+        max_uses: Contexts served by a browser before it is recycled.
+    """
+
+    def __init__(self, size: int, max_pages: int, max_uses: int):
+        self.size = size
+        self.max_pages = max_pages
+        self.max_uses = max_uses
+        self._playwright: Playwright | None = None
+        self._slots: list[_Slot] = []
+        self._pages = asyncio.Semaphore(max_pages)
+        self._lock = asyncio.Lock()
+        self._retired: set[Browser] = set()
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    async def start(self) -> None:
+        """Start Playwright and launch the initial set of browsers."""
+        async with self._lock:
+            if self._playwright is not None:
+                return
+            self._playwright = await async_playwright().start()
+            self._slots = [_Slot() for _ in range(self.size)]
+            for slot in self._slots:
+                await self._launch(slot)
+        log.info(f"Browser pool started → {self.size} browsers, {self.max_pages} concurrent pages")
+
+    async def stop(self) -> None:
+        """Close every browser and shut down Playwright."""
+        async with self._lock:
+            browsers = [s.browser for s in self._slots if s.browser] + list(self._retired)
+            for browser in browsers:
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+            self._slots = []
+            self._retired.clear()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+        log.info("Browser pool stopped")
+
+    async def _launch(self, slot: _Slot) -> None:
+        """(Re)launch the browser in a slot and reset its counters."""
+        slot.browser = await self._playwright.chromium.launch(headless=True)
+        slot.uses = 0
+        slot.active = 0
+
+    async def _replace(self, slot: _Slot) -> None:
+        """Relaunch a slot's browser. Must be called with the lock held.
+
+        A still-connected old browser with contexts open is retired until
+        they are released; otherwise it is closed right away.
+        """
+        old = slot.browser
+        if old is not None:
+            if slot.active and old.is_connected():
+                self._retired.add(old)
+            else:
+                try:
+                    await old.close()
+                except Exception:
+                    pass
+        await self._launch(slot)
+
+    async def _acquire_slot(self) -> _Slot:
+        """Pick the least-busy slot, replacing crashed or worn-out browsers."""
+        async with self._lock:
+            slot = min(self._slots, key=lambda s: s.active)
+
+            if not slot.healthy:
+                if slot.browser is not None:
+                    log.warning("Pooled browser is not connected — relaunching")
+                await self._replace(slot)
+            elif slot.uses >= self.max_uses:
+                log.info(f"Recycling pooled browser after {slot.uses} uses")
+                await self._replace(slot)
+
+            slot.uses += 1
+            slot.active += 1
+            return slot
+
+    async def _release_slot(self, slot: _Slot, browser: Browser) -> None:
+        async with self._lock:
+            if browser is slot.browser:
+                slot.active = max(0, slot.active - 1)
+            elif browser in self._retired:
+                # Retired browsers only serve their remaining contexts
+                still_open = any(c for c in browser.contexts)
+                if not still_open:
+                    self._retired.discard(browser)
+                    try:
+                        await browser.close()
+                    except Exception:
+                        pass
+
+    @asynccontextmanager
+    async def context(self) -> AsyncIterator[BrowserContext]:
+        """Yield an isolated BrowserContext, closing it when done.
+
+        Starts the pool on first use, so callers outside the server
+        lifespan (e.g. the CLI) need no extra setup beyond stop().
+        """
+        if not self.started:
+            await self.start()
+
+        async with self._pages:
+            slot = await self._acquire_slot()
+            browser = slot.browser
+            try:
+                ctx = await browser.new_context()
+            except Exception as e:
+                # Browser died (or hiccupped) between the health check and now — retry once on a fresh one
+                await self._release_slot(slot, browser)
+                async with self._lock:
+                    # Another playtest may already have replaced it
+                    if slot.browser is browser:
+                        log.warning(f"Could not open a context on the pooled browser ({e}) — relaunching")
+                        await self._replace(slot)
+                    slot.uses += 1
+                    slot.active += 1
+                    browser = slot.browser
+                ctx = await browser.new_context()
+            try:
+                yield ctx
+            finally:
+                try:
+                    await ctx.close()
+                except Exception:
+                    pass
+                await self._release_slot(slot, browser)
+
+    def status(self) -> dict:
+        """Report pool status for health checks."""
+        return {
+            "started": self.started,
+            "browsers": [
+                {"connected": s.healthy, "uses": s.uses, "active": s.active}
+                for s in self._slots
+            ],
+            "retired": len(self._retired),
+        }
+
+
+browser_pool = BrowserPool(
+    size=settings.browser_pool_size,
+    max_pages=settings.browser_max_pages,
+    max_uses=settings.browser_max_uses,
+)
@@ -1,29 +1,234 @@
-"""HTML validation for the generated Kaplay game output."""
+"""HTML validation for the generated Kaplay game output.
+
+analyze_game is a fast static pre-flight run before the browser
+playtest. It checks the document structure, detects output that was
+cut off (e.g. the model hit max_tokens), parses every inline script
+with esprima, and flags calls to functions that are neither declared
+in the page, JS/browser built-ins, nor part of the Kaplay API in
+kaplay_docs/types.ts.
+
+Only what is certain fails the check: broken structure, truncation,
+and methods called on a kaplay() alias that the API does not have.
+esprima stops at ES2017 and no globals list is complete, so other parse
+errors and unknown bare calls are warnings and Chromium has the last
+word.
+"""
 
 import re
-from langchain.tools import tool
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
 
+import esprima
+from langchain_core.tools import tool
 
-@tool
-def validate_html(html_code: str) -> str:
-    """Run basic validation checks on the generated HTML game code."""
-    issues = []
-
-    if "<!DOCTYPE html>" not in html_code:
-        issues.append("Missing <!DOCTYPE html> declaration")
-    if "<html" not in html_code:
-        issues.append("Missing <html> tag")
-    if "kaplay" not in html_code.lower():
-        issues.append("Missing Kaplay CDN script reference")
+from tools.lexical_index import extract_symbols
+
+TYPES_TS = Path(__file__).resolve().parent.parent / "kaplay_docs" / "types.ts"
+
+SCRIPT_RE = re.compile(r"<script\b([^>]*)>(.*?)</script>", re.DOTALL | re.IGNORECASE)
+
+# Common callable globals; anything else unknown is only a warning
+JS_GLOBALS = {
+    "AggregateError", "Array", "ArrayBuffer", "BigInt", "Boolean", "DataView", "Date", "Error",
+    "EvalError", "Float32Array", "Float64Array", "Function", "Int16Array", "Int32Array",
+    "Int8Array", "Map", "Number", "Object", "Promise", "Proxy", "RangeError", "ReferenceError",
+    "RegExp", "Set", "String", "Symbol", "SyntaxError", "TypeError", "URIError", "Uint16Array",
+    "Uint32Array", "Uint8Array", "Uint8ClampedArray", "WeakMap", "WeakRef", "WeakSet",
+    "addEventListener", "alert", "atob", "btoa", "cancelAnimationFrame", "clearInterval",
+    "clearTimeout", "confirm", "createImageBitmap", "decodeURI", "decodeURIComponent",
+    "dispatchEvent", "encodeURI", "encodeURIComponent", "eval", "fetch", "getComputedStyle",
+    "isFinite", "isNaN", "matchMedia", "parseFloat", "parseInt", "postMessage", "prompt",
+    "queueMicrotask", "removeEventListener", "requestAnimationFrame", "requestIdleCallback",
+    "scrollTo", "setInterval", "setTimeout", "structuredClone",
+}
+
+
+@lru_cache(maxsize=1)
+def kaplay_symbols() -> frozenset[str]:
+    """Identifiers declared in kaplay_docs/types.ts, plus the kaplay() entry point."""
+    return frozenset(extract_symbols(TYPES_TS.read_text(encoding="utf-8")) | {"kaplay"})
+
+
+@dataclass
+class StaticReport:
+    """Result of the static pre-flight check."""
+    errors: list[str] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+    scripts: int = 0
+    elapsed_ms: float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        return not self.errors
+
+    @property
+    def summary(self) -> str:
+        lines = [f"Static check: {'PASSED' if self.passed else 'FAILED'} ({self.scripts} inline scripts, {self.elapsed_ms:.0f} ms)"]
+        if self.errors:
+            lines.append("\nERRORS:")
+            lines.extend(f"- {e}" for e in self.errors)
+        if self.warnings:
+            lines.append("\nWARNINGS:")
+            lines.extend(f"- {w}" for w in self.warnings)
+        return "\n".join(lines)
+
+
+def _children(node):
+    for value in vars(node).values():
+        if isinstance(value, list):
+            for item in value:
+                if hasattr(item, "type"):
+                    yield item
+        elif hasattr(value, "type"):
+            yield value
+
+
+def _walk(node):
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(_children(current))
+
+
+def _pattern_names(pattern) -> list[str]:
+    """Names bound by a declaration target (identifier or destructuring pattern)."""
+    if pattern is None:
+        return []
+    kind = pattern.type
+    if kind == "Identifier":
+        return [pattern.name]
+    if kind == "ObjectPattern":
+        return [n for prop in pattern.properties for n in _pattern_names(getattr(prop, "value", None) or getattr(prop, "argument", None))]
+    if kind == "ArrayPattern":
+        return [n for el in pattern.elements for n in _pattern_names(el)]
+    if kind == "AssignmentPattern":
+        return _pattern_names(pattern.left)
+    if kind == "RestElement":
+        return _pattern_names(pattern.argument)
+    return []
+
+
+def _declared_names(tree) -> tuple[set[str], set[str]]:
+    """Names declared anywhere in a script, and aliases bound to kaplay()."""
+    declared: set[str] = set()
+    aliases: set[str] = set()
+    for node in _walk(tree):
+        kind = node.type
+        if kind in ("FunctionDeclaration", "FunctionExpression", "ArrowFunctionExpression"):
+            if getattr(node, "id", None) is not None:
+                declared.add(node.id.name)
+            for param in node.params:
+                declared.update(_pattern_names(param))
+        elif kind == "VariableDeclarator":
+            declared.update(_pattern_names(node.id))
+            init = node.init
+            if init is not None and init.type == "CallExpression" and init.callee.type == "Identifier" and init.callee.name == "kaplay":
+                aliases.add(node.id.name)
+        elif kind in ("ClassDeclaration", "ClassExpression") and getattr(node, "id", None) is not None:
+            declared.add(node.id.name)
+        elif kind == "CatchClause" and node.param is not None:
+            declared.update(_pattern_names(node.param))
+        elif kind in ("ImportSpecifier", "ImportDefaultSpecifier", "ImportNamespaceSpecifier"):
+            declared.add(node.local.name)
+        elif kind == "AssignmentExpression" and node.left.type == "MemberExpression":
+            # window.foo = ... / globalThis.foo = ...
+            obj, prop = node.left.object, node.left.property
+            if obj.type == "Identifier" and obj.name in ("window", "globalThis", "self") and prop.type == "Identifier":
+                declared.add(prop.name)
+    return declared, aliases
+
+
+def _unknown_calls(tree, declared: set[str], aliases: set[str], line_offset: int, index: int, report: StaticReport) -> None:
+    """Unknown bare calls are warnings; unknown methods on a kaplay() alias are errors."""
+    symbols = kaplay_symbols()
+    seen = set()
+    for node in _walk(tree):
+        if node.type != "CallExpression":
+            continue
+        callee = node.callee
+        line = node.loc.start.line + line_offset if node.loc else "?"
+        if callee.type == "Identifier":
+            name = callee.name
+            if name in declared or name in symbols or name in JS_GLOBALS or name in seen:
+                continue
+            seen.add(name)
+            report.warnings.append(f"Script {index}, line {line}: call to undefined function {name}() — not declared in the page and not a Kaplay API")
+        elif callee.type == "MemberExpression" and not callee.computed:
+            obj, prop = callee.object, callee.property
+            if obj.type == "Identifier" and obj.name in aliases and prop.name not in symbols:
+                key = f"{obj.name}.{prop.name}"
+                if key in seen:
+                    continue
+                seen.add(key)
+                report.errors.append(f"Script {index}, line {line}: {key}() is not part of the Kaplay API")
+
+
+def analyze_game(html_code: str) -> StaticReport:
+    """Run the static pre-flight checks on a generated game."""
+    start = time.perf_counter()
+    report = StaticReport()
+    lower = html_code.lower()
+
+    # ── Structure ──
+    if "<!doctype html>" not in lower:
+        report.warnings.append("Missing <!DOCTYPE html> declaration")
+    if "<html" not in lower:
+        report.errors.append("Missing <html> tag")
+    if not html_code.rstrip().lower().endswith("</html>"):
+        report.errors.append("File appears truncated: it does not end with </html>. Output the complete file.")
+    opens = len(re.findall(r"<script\b", html_code, re.IGNORECASE))
+    closes = len(re.findall(r"</script>", html_code, re.IGNORECASE))
+    if opens != closes:
+        report.errors.append(f"Unbalanced script tags: {opens} open, {closes} close")
+    if not re.search(r"<script\b[^>]*\bsrc=[\"'][^\"']*kaplay", html_code, re.IGNORECASE):
+        report.errors.append("Missing Kaplay CDN <script src=...> tag")
     if "kaplay(" not in html_code:
-        issues.append("Missing kaplay() initialization")
+        report.errors.append("Missing kaplay() initialization")
+
+    # ── Inline scripts ──
+    parsed = []
+    for match in SCRIPT_RE.finditer(html_code):
+        attrs, code = match.group(1), match.group(2)
+        if "src=" in attrs.lower() or not code.strip():
+            continue
+        report.scripts += 1
+        index = report.scripts
+        line_offset = html_code.count("\n", 0, match.start(2))
+        is_module = "module" in attrs.lower()
+        try:
+            options = {"loc": True}
+            tree = esprima.parseModule(code, options) if is_module else esprima.parseScript(code, options)
+            parsed.append((tree, line_offset, index))
+        except esprima.Error as e:
+            line = e.lineNumber + line_offset
+            reason = e.message.split(": ", 1)[-1]
+            if "end of input" in e.message.lower():
+                report.errors.append(f"Script {index} is cut off (unexpected end of input at line {line}). Output the complete file.")
+            else:
+                # Possibly valid syntax newer than esprima understands; the browser run decides
+                report.warnings.append(f"Script {index}, line {line}: possible syntax error — {reason}; left to the browser run")
+
+    # Names may be declared in one script and used in another
+    declared: set[str] = set()
+    aliases: set[str] = set()
+    for tree, _, _ in parsed:
+        names, kaplay_aliases = _declared_names(tree)
+        declared |= names
+        aliases |= kaplay_aliases
+    for tree, line_offset, index in parsed:
+        _unknown_calls(tree, declared, aliases, line_offset, index, report)
 
-    # Check for balanced script tags
-    open_scripts = len(re.findall(r"<script", html_code))
-    close_scripts = len(re.findall(r"</script>", html_code))
-    if open_scripts != close_scripts:
-        issues.append(f"Unbalanced script tags: {open_scripts} open, {close_scripts} close")
+    report.elapsed_ms = (time.perf_counter() - start) * 1000
+    return report
 
-    if not issues:
-        return "VALID: All basic checks passed."
-    return "ISSUES FOUND:\n" + "\n".join(f"- {i}" for i in issues)
+
+@tool
+def validate_html(html_code: str) -> str:
+    """Run static validation checks on the generated HTML game code."""
+    report = analyze_game(html_code)
+    if report.passed:
+        return "VALID: All static checks passed." + (f"\n{report.summary}" if report.warnings else "")
+    return "ISSUES FOUND:\n" + report.summary
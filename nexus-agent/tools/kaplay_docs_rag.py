@@ -1,41 +1,219 @@
-"""Kaplay.js documentation retrieval via ChromaDB vector store."""
+"""Kaplay.js documentation retrieval via ChromaDB vector store.
+
+Results are cached in memory (LRU + TTL) by normalized query. The cache
+is tied to the collection's "version" metadata stamp, which
+scripts/createragdb.py bumps on every ingest; the stamp is re-read at
+most every settings.rag_version_check_s and a change clears the cache.
+
+Retrieval is hybrid: dense results from Chroma are fused by reciprocal
+rank with BM25 and symbol-table hits from the lexical index written at
+ingest (tools/lexical_index.py), when that index exists.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
 
 from langchain_core.tools import tool
 
+from tools.lexical_index import INDEX_FILENAME, LexicalIndex, reciprocal_rank_fusion
 from utils.config import settings
+from utils.logger import get_logger
+
+log = get_logger("kaplay_docs_rag")
 
+COLLECTION_NAME = "kaplay_docs"
+N_RESULTS = 5
+# Candidates taken from each ranking before fusion
+N_CANDIDATES = 10
+
+_client = None
 _collection = None
+_lexical: LexicalIndex | None = None
+_NOT_LOADED = object()
+_version: str | None | object = _NOT_LOADED
+_version_checked_at = 0.0
+_lock = threading.Lock()
+
+
+class QueryCache:
+    """Thread-safe LRU cache with per-entry expiry.
+
+    Args:
+        max_entries: Entries kept before the least recently used is evicted.
+        ttl_s: Seconds an entry stays valid.
+    """
+
+    def __init__(self, max_entries: int, ttl_s: float):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_s:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+query_cache = QueryCache(settings.rag_cache_size, settings.rag_cache_ttl_s)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
 
 
 def _get_collection():
-    """Lazy-init the ChromaDB collection on first use."""
-    global _collection
-    if _collection is None:
-        import chromadb
-        client = chromadb.PersistentClient(path=settings.chroma_db_dir)
-        _collection = client.get_collection("kaplay_docs")
-    return _collection
+    """Lazy-init the ChromaDB collection, refreshing it when the ingest version changes."""
+    global _client, _collection, _lexical, _version, _version_checked_at
+    with _lock:
+        now = time.monotonic()
+        if _collection is not None and now - _version_checked_at < settings.rag_version_check_s:
+            return _collection
 
+        if _client is None:
+            import chromadb
+            _client = chromadb.PersistentClient(path=settings.chroma_db_dir)
+        _collection = _client.get_collection(COLLECTION_NAME)
+        _version_checked_at = now
 
-@tool
-def search_kaplay_docs(query: str) -> str:
-    """Search Kaplay.js documentation for API references, method signatures, and usage patterns.
+        version = (_collection.metadata or {}).get("version")
+        if version != _version:
+            if _version is not _NOT_LOADED:
+                log.info(f"Docs collection version {_version} → {version}; clearing query cache")
+            query_cache.clear()
+            _version = version
+            _lexical = LexicalIndex.load(settings.chroma_db_dir)
+            if _lexical is None:
+                log.warning("No lexical index found; using dense retrieval only (re-run scripts/createragdb.py)")
+            elif _lexical.version != version:
+                log.warning("Lexical index is older than the docs collection; re-run scripts/createragdb.py")
+        elif _lexical is None and (Path(settings.chroma_db_dir) / INDEX_FILENAME).exists():
+            # Built after this version was loaded: switch to hybrid retrieval once
+            _lexical = LexicalIndex.load(settings.chroma_db_dir)
+            query_cache.clear()
+            log.info("Lexical index found; using hybrid retrieval")
+        return _collection
 
-    Each call must use a NEW, specific query — one question per call.
-    Good:  "how to use tween for animation"
-    Good:  "area component collision shapes"
-    Bad:   "tween and collision and sprites" (too many topics bundled)
-    Bad:   repeating a previous query verbatim
+
+def warm_up() -> None:
+    """Open the collection, load the lexical index and embedding model, and run a dummy query.
+
+    Blocking; the server runs it in a thread at startup so the first
+    tool call doesn't pay for imports and model loading.
     """
+    start = time.perf_counter()
     collection = _get_collection()
-    results = collection.query(query_texts=[query], n_results=5)
+    collection.query(query_texts=["kaplay"], n_results=1)
+    log.info(f"Docs collection warm ({collection.count()} chunks) in {(time.perf_counter() - start) * 1000:.0f} ms")
 
-    if not results["documents"] or not results["documents"][0]:
+
+def _format_results(query: str, docs: list[str], metas: list[dict]) -> str:
+    if not docs:
         return f"No results found for: {query}"
 
     chunks = []
-    for doc, meta in zip(results["documents"][0], results["metadatas"][0]):
+    for doc, meta in zip(docs, metas):
         header = f"[{meta['title']}] ({meta['source']})"
         chunks.append(f"{header}\n{doc}")
 
     return "\n\n---\n\n".join(chunks)
+
+
+def search_kaplay_docs_batch(queries: list[str]) -> list[str]:
+    """Look up many queries, embedding and searching all cache misses in one call.
+
+    Returns formatted results in the same order as queries. The
+    normalized form of a query is only its cache key; retrieval uses the
+    query as written, so case-sensitive symbol lookups still match.
+    """
+    collection = _get_collection()
+    keys = [normalize_query(q) for q in queries]
+
+    results: dict[str, str] = {}
+    missing: dict[str, str] = {}  # cache key -> first query seen with it
+    for key, query in zip(keys, queries):
+        if key in results or key in missing:
+            continue
+        cached = query_cache.get(key)
+        if cached is None:
+            missing[key] = " ".join(query.split())
+        else:
+            results[key] = cached
+
+    if missing:
+        texts = list(missing.values())
+        found = collection.query(query_texts=texts, n_results=N_CANDIDATES if _lexical else N_RESULTS)
+        chunks: dict[str, tuple[str, dict]] = {}
+        rankings: list[list[str]] = []
+        for i in range(len(missing)):
+            dense = found["ids"][i] if found["ids"] else []
+            for j, chunk_id in enumerate(dense):
+                chunks[chunk_id] = (found["documents"][i][j], found["metadatas"][i][j])
+            rankings.append(dense)
+
+        if _lexical is not None:
+            rankings = [
+                reciprocal_rank_fusion([
+                    dense,
+                    _lexical.bm25(text, N_CANDIDATES),
+                    _lexical.symbol_hits(text, N_CANDIDATES),
+                ])[:N_RESULTS]
+                for text, dense in zip(texts, rankings)
+            ]
+            # One fetch for every lexical-only hit across the batch
+            extra = sorted({cid for ranking in rankings for cid in ranking} - chunks.keys())
+            if extra:
+                got = collection.get(ids=extra, include=["documents", "metadatas"])
+                for chunk_id, doc, meta in zip(got["ids"], got["documents"], got["metadatas"]):
+                    chunks[chunk_id] = (doc, meta)
+
+        for (key, text), ranking in zip(missing.items(), rankings):
+            hits = [chunks[cid] for cid in ranking if cid in chunks][:N_RESULTS]
+            results[key] = _format_results(text, [d for d, _ in hits], [m for _, m in hits])
+            query_cache.put(key, results[key])
+
+    return [results[key] for key in keys]
+
+
+@tool
+def search_kaplay_docs(query: str) -> str:
+    """Search Kaplay.js documentation for API references, method signatures, and usage patterns.
+
+    Each call must use a NEW, specific query — one question per call.
+    Good:  "how to use tween for animation"
+    Good:  "area component collision shapes"
+    Bad:   "tween and collision and sprites" (too many topics bundled)
+    Bad:   repeating a previous query verbatim
+    """
+    return search_kaplay_docs_batch([query])[0]
@@ -0,0 +1,141 @@
+"""BM25 index and Kaplay symbol table over the doc chunks.
+
+Built by scripts/createragdb.py from the same chunks that go into
+Chroma and saved next to the store. search_kaplay_docs fuses its
+rankings with the dense results so exact API identifiers such as
+onKeyPress or area() reliably surface the chunk that declares them.
+"""
+
+import json
+import math
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+
+INDEX_FILENAME = "lexical_index.json"
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+RRF_K = 60
+
+IDENT_RE = re.compile(r"[A-Za-z_$][\w$]*|\d+")
+CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "be", "by", "for", "from", "how", "i", "in", "is",
+    "it", "of", "on", "or", "the", "this", "to", "use", "using", "what", "with",
+}
+
+# Declarations in the .d.ts: top-level exports and tab-indented members
+EXPORT_RE = re.compile(
+    r"^export\s+(?:declare\s+)?(?:abstract\s+)?(?:function|const|let|var|class|interface|type|enum)\s+([A-Za-z_$][\w$]*)",
+    re.MULTILINE,
+)
+MEMBER_RE = re.compile(r"^\t([A-Za-z_$][\w$]*)\??\s*[(<:]", re.MULTILINE)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased identifiers plus their camelCase parts, minus stopwords."""
+    tokens = []
+    for word in IDENT_RE.findall(text):
+        lower = word.lower()
+        if lower not in STOPWORDS:
+            tokens.append(lower)
+        parts = CAMEL_RE.findall(word)
+        if len(parts) > 1:
+            tokens.extend(p.lower() for p in parts if p.lower() not in STOPWORDS)
+    return tokens
+
+
+def extract_symbols(ts_chunk: str) -> set[str]:
+    """Identifiers declared in a chunk of kaplay_docs/types.ts."""
+    return set(EXPORT_RE.findall(ts_chunk)) | set(MEMBER_RE.findall(ts_chunk))
+
+
+def build_index(ids: list[str], documents: list[str], metadatas: list[dict], version: str | None) -> dict:
+    """Build the serializable BM25 postings and symbol table."""
+    postings: dict[str, list[list[int]]] = defaultdict(list)
+    lengths = []
+    symbols: dict[str, list[str]] = defaultdict(list)
+
+    for doc_idx, (chunk_id, doc, meta) in enumerate(zip(ids, documents, metadatas)):
+        tokens = tokenize(f"{meta.get('title', '')}\n{doc}")
+        lengths.append(len(tokens))
+        for term, tf in Counter(tokens).items():
+            postings[term].append([doc_idx, tf])
+        if meta.get("category") == "typescript":
+            for name in extract_symbols(doc):
+                symbols[name].append(chunk_id)
+
+    return {
+        "version": version,
+        "ids": ids,
+        "lengths": lengths,
+        "postings": dict(postings),
+        "symbols": dict(symbols),
+    }
+
+
+def save_index(index: dict, directory: Path) -> Path:
+    path = Path(directory) / INDEX_FILENAME
+    path.write_text(json.dumps(index, separators=(",", ":")))
+    return path
+
+
+class LexicalIndex:
+    """Query-side view of a saved index."""
+
+    def __init__(self, data: dict):
+        self.version = data.get("version")
+        self.ids: list[str] = data["ids"]
+        self.lengths: list[int] = data["lengths"]
+        self.postings: dict[str, list[list[int]]] = data["postings"]
+        self.symbols: dict[str, list[str]] = data["symbols"]
+        self._symbols_lower: dict[str, list[str]] = defaultdict(list)
+        for name, chunk_ids in self.symbols.items():
+            self._symbols_lower[name.lower()].extend(chunk_ids)
+        self._avgdl = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    @classmethod
+    def load(cls, directory: Path) -> "LexicalIndex | None":
+        path = Path(directory) / INDEX_FILENAME
+        if not path.exists():
+            return None
+        return cls(json.loads(path.read_text()))
+
+    def bm25(self, query: str, k: int) -> list[str]:
+        """Top-k chunk ids by BM25 score."""
+        n = len(self.ids)
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_idx, tf in posting:
+                norm = 1 - BM25_B + BM25_B * self.lengths[doc_idx] / self._avgdl
+                scores[doc_idx] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+        ranked = sorted(scores, key=scores.get, reverse=True)[:k]
+        return [self.ids[i] for i in ranked]
+
+    def symbol_hits(self, query: str, k: int) -> list[str]:
+        """Chunk ids declaring any identifier named in the query, exact case first."""
+        hits: list[str] = []
+        for word in IDENT_RE.findall(query):
+            if word.lower() in STOPWORDS:
+                continue
+            for chunk_id in self.symbols.get(word) or self._symbols_lower.get(word.lower(), []):
+                if chunk_id not in hits:
+                    hits.append(chunk_id)
+        return hits[:k]
+
+    def known_symbols(self) -> set[str]:
+        return set(self.symbols)
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = RRF_K) -> list[str]:
+    """Merge ranked id lists; ids ranked well in several lists come first."""
+    scores: dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking):
+            scores[chunk_id] += 1 / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
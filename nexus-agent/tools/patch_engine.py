@@ -0,0 +1,123 @@
+"""Search/replace patch engine for targeted revisions of generated game code.
+
+In a fix iteration the coder returns only the edits it wants to make, as
+SEARCH/REPLACE blocks:
+
+    <<<<<<< SEARCH
+    exact lines from the current file
+    =======
+    replacement lines
+    >>>>>>> REPLACE
+
+Each SEARCH section must match exactly one place in the file. Exact
+matches are tried first (with and without the block's final newline),
+then a line-based match that ignores indentation and trailing
+whitespace. Any block that cannot be applied unambiguously fails the
+whole patch, so the caller can fall back to full regeneration.
+"""
+
+import re
+from dataclasses import dataclass
+
+BLOCK_RE = re.compile(
+    r"^<{5,9} SEARCH[^\n]*\n(.*?)^={5,9}[ \t]*\n(.*?)^>{5,9} REPLACE[^\n]*$",
+    re.DOTALL | re.MULTILINE,
+)
+
+
+class PatchError(Exception):
+    """Raised when a patch cannot be parsed or applied cleanly."""
+
+
+@dataclass
+class Edit:
+    """One search/replace edit."""
+    search: str
+    replace: str
+
+
+def parse_patch(text: str) -> list[Edit]:
+    """Extract SEARCH/REPLACE blocks from a model response.
+
+    Raises:
+        PatchError: If the response contains no blocks.
+    """
+    edits = [Edit(search=m.group(1), replace=m.group(2)) for m in BLOCK_RE.finditer(text)]
+    if not edits:
+        raise PatchError("No SEARCH/REPLACE blocks found in response")
+    return edits
+
+
+def _find_loose(lines: list[str], search_lines: list[str]) -> list[int]:
+    """Start indices where search_lines match ignoring surrounding whitespace."""
+    target = [l.strip() for l in search_lines]
+    stripped = [l.strip() for l in lines]
+    n = len(target)
+    return [i for i in range(len(lines) - n + 1) if stripped[i:i + n] == target]
+
+
+def _apply_one(source: str, edit: Edit, index: int) -> str:
+    search = edit.search
+    if not search.strip():
+        raise PatchError(f"Block {index}: empty SEARCH section")
+
+    # Exact match, then exact match without the block's trailing newline
+    # (for a SEARCH that covers only part of a line)
+    for search_text, replace_text in ((search, edit.replace), (search.rstrip("\n"), edit.replace.rstrip("\n"))):
+        count = source.count(search_text)
+        if count == 1:
+            return source.replace(search_text, replace_text, 1)
+        if count > 1:
+            raise PatchError(f"Block {index}: SEARCH matches {count} places; include more context")
+
+    # Fall back to a whitespace-insensitive, line-based match
+    lines = source.splitlines(keepends=True)
+    search_lines = search.strip("\n").splitlines()
+    starts = _find_loose(lines, search_lines)
+    if len(starts) != 1:
+        reason = "not found" if not starts else f"matches {len(starts)} places"
+        first = search_lines[0].strip() if search_lines else ""
+        raise PatchError(f"Block {index}: SEARCH {reason} (first line: {first[:80]!r})")
+
+    start = starts[0]
+    end = start + len(search_lines)
+    replacement = edit.replace
+    if replacement and not replacement.endswith("\n") and end < len(lines):
+        replacement += "\n"
+    return "".join(lines[:start]) + replacement + "".join(lines[end:])
+
+
+def validate_patched(original: str, patched: str) -> list[str]:
+    """Structural checks that a patch did not break the document."""
+    problems = []
+    if not patched.strip():
+        problems.append("Patched file is empty")
+    if "</html>" in original.lower() and "</html>" not in patched.lower():
+        problems.append("Patched file lost its closing </html> tag")
+    opens = len(re.findall(r"<script\b", patched, re.IGNORECASE))
+    closes = len(re.findall(r"</script>", patched, re.IGNORECASE))
+    if opens != closes:
+        problems.append(f"Unbalanced script tags after patch: {opens} open, {closes} close")
+    if "kaplay(" in original and "kaplay(" not in patched:
+        problems.append("Patched file no longer calls kaplay()")
+    return problems
+
+
+def apply_patch(source: str, patch_text: str) -> tuple[str, int]:
+    """Apply every edit in patch_text to source.
+
+    Returns:
+        The patched source and the number of edits applied.
+
+    Raises:
+        PatchError: If any block fails to apply or the result fails validation.
+    """
+    edits = parse_patch(patch_text)
+    patched = source
+    for i, edit in enumerate(edits, 1):
+        patched = _apply_one(patched, edit, i)
+
+    problems = validate_patched(source, patched)
+    if problems:
+        raise PatchError("; ".join(problems))
+    return patched, len(edits)
@@ -0,0 +1,52 @@
+"""Scripted inputs for interactive playtests, per game template type.
+
+Each script has a start phase (get past title/menu screens) and a play
+phase (exercise the core controls), replayed in every scene the driver
+visits. Steps are plain tuples:
+
+    ("press", key, times)   tap a key
+    ("hold", key, ms)       hold a key down
+    ("click", fx, fy)       click at a fraction of the canvas size
+    ("move", fx, fy)        move the mouse to a fraction of the canvas size
+    ("type", text)          type characters
+    ("wait", ms)            let the game run
+"""
+
+from dataclasses import dataclass, field
+
+Step = tuple
+
+
+@dataclass(frozen=True)
+class PlayScript:
+    start: list[Step] = field(default_factory=list)
+    play: list[Step] = field(default_factory=list)
+
+
+START = [("click", 0.5, 0.5), ("press", "Enter", 1), ("press", "Space", 1), ("wait", 300)]
+
+ARROWS = [
+    ("hold", "ArrowRight", 400), ("hold", "ArrowLeft", 400),
+    ("hold", "ArrowUp", 300), ("hold", "ArrowDown", 300),
+]
+
+GRID_CLICKS = [("click", x / 4, y / 4) for y in (1, 2, 3) for x in (1, 2, 3)]
+
+PLAY_SCRIPTS: dict[str, PlayScript] = {
+    "platformer": PlayScript(START, [("hold", "ArrowRight", 600), ("press", "Space", 2), ("hold", "ArrowLeft", 400), ("press", "ArrowUp", 1), ("wait", 300)]),
+    "maze": PlayScript(START, ARROWS + [("wait", 200)]),
+    "shootemup": PlayScript(START, ARROWS + [("press", "Space", 5), ("hold", "Space", 400)]),
+    "breakout": PlayScript(START, [("press", "Space", 1), ("hold", "ArrowLeft", 400), ("hold", "ArrowRight", 400), ("move", 0.2, 0.9), ("move", 0.8, 0.9), ("click", 0.5, 0.9)]),
+    "fighter": PlayScript(START, ARROWS + [("press", "Space", 3), ("press", "KeyF", 2), ("press", "KeyG", 2), ("press", "KeyJ", 2), ("press", "KeyK", 2)]),
+    "beatemup": PlayScript(START, ARROWS + [("press", "Space", 3), ("press", "KeyJ", 2), ("press", "KeyK", 2)]),
+    "match3": PlayScript(START, GRID_CLICKS),
+    "towerdefense": PlayScript(START, GRID_CLICKS + [("press", "Space", 1), ("wait", 500)]),
+    "quizrunner": PlayScript(START, [("press", "Space", 2), ("press", "Digit1", 1), ("press", "Digit2", 1), ("press", "ArrowUp", 1), ("press", "ArrowDown", 1), ("click", 0.5, 0.6)]),
+    "typingword": PlayScript(START, [("type", "the quick brown fox"), ("press", "Enter", 1), ("press", "Backspace", 2)]),
+}
+
+DEFAULT_SCRIPT = PlayScript(START, ARROWS + [("press", "Space", 2), ("press", "Enter", 1), ("click", 0.5, 0.5)])
+
+
+def play_script(game_type: str | None) -> PlayScript:
+    return PLAY_SCRIPTS.get(game_type or "", DEFAULT_SCRIPT)
@@ -1,18 +1,193 @@
 """Headless browser test harness for playtesting generated games.
 
-Writes the game HTML to a temp file, loads it in headless Chromium via
-Playwright, and captures console errors / uncaught exceptions on startup.
+Serves the game HTML from memory on a virtual origin, loads it in a fresh
+context on the shared headless Chromium pool, and captures console
+errors / uncaught exceptions on startup. Requests for the Kaplay CDN
+bundle are answered from a local on-disk cache through the same route
+handler, so playtests touch neither temp files nor the network once the
+cache is warm.
+
+In adaptive mode the run ends as soon as the outcome is known: on the
+first uncaught page error, or once the Kaplay game loop has ticked a set
+number of frames without errors. The fixed wait is only an upper bound.
+
+In interactive mode a settled game is then played: the scripted inputs
+for its game type (tools/play_scripts.py) are replayed, every
+argument-free scene the game registered but never reached is entered
+directly, and requestAnimationFrame frame times and errors are
+recorded per scene.
+
+With settings.perf_enabled the run is also profiled: JS heap size is
+polled over CDP (Performance.getMetrics), and the hook records long
+tasks, frame times and the live Kaplay object count. Profiling starts
+once the game has loaded and settled, so engine startup, script parsing
+and decoding embedded assets don't count as growth or long tasks; in
+practice it covers the scripted play. The resulting PerfReport is
+checked against the settings.perf_* thresholds; a breach is a playtest
+failure just like a runtime error.
 """
 
-import tempfile
-import os
+import asyncio
+import hashlib
+import statistics
 from dataclasses import dataclass, field
-from playwright.async_api import async_playwright
+from pathlib import Path
+from urllib.parse import urlparse
 
+from playwright.async_api import Route
+
+from tools.browser_pool import browser_pool
+from tools.play_scripts import Step, play_script
+from utils.config import settings
 from utils.logger import get_logger
 
 log = get_logger("puppeteer_runner")
 
+PLAYTEST_ORIGIN = "http://playtest.nexus.local"
+PLAYTEST_URL = f"{PLAYTEST_ORIGIN}/index.html"
+CDN_HOSTS = {"unpkg.com", "cdn.jsdelivr.net"}
+
+# In-process copy of cached CDN assets: url → (body, content type)
+_cdn_assets: dict[str, tuple[bytes, str]] = {}
+
+# Injected before any page script runs. Wraps the global kaplay() factory and
+# counts requestAnimationFrame ticks once kaplay() has returned, reporting back
+# after SETTLE_FRAMES of them. The counter lives in the hook's own rAF loop
+# rather than a k.onUpdate handler, because go() clears root and game events
+# on every scene switch and would drop the handler. Also records the scenes
+# the game registers (with their argument counts), requestAnimationFrame
+# frame times and uncaught errors, both keyed by the current scene.
+KAPLAY_HOOK_JS = """
+(() => {
+    const SETTLE_FRAMES = %(settle_frames)d;
+    const MAX_SAMPLES = 20000;
+    const OBJECT_SAMPLE_MS = %(sample_ms)d;
+    const nexus = window.__nexus = {
+        frames: 0, hooked: false, k: null,
+        scenes: {}, visited: [], frameTimes: {}, errors: [], samples: 0,
+        longTasks: [], objects: [], perfStart: null, perfFrames: [],
+    };
+    const sceneName = () => {
+        try { return (nexus.k && nexus.k.getSceneName && nexus.k.getSceneName()) || "(boot)"; }
+        catch (e) { return "(boot)"; }
+    };
+    const recordError = (message) => nexus.errors.push({ scene: sceneName(), message: String(message) });
+    window.addEventListener("error", (e) => recordError(e.message || e.error));
+    window.addEventListener("unhandledrejection", (e) => recordError((e.reason && e.reason.message) || e.reason));
+    try {
+        new PerformanceObserver((list) => {
+            for (const entry of list.getEntries()) {
+                if (nexus.perfStart !== null && entry.startTime >= nexus.perfStart) nexus.longTasks.push(entry.duration);
+            }
+        }).observe({ type: "longtask" });
+    } catch (e) {}
+    const objectCount = (k) => (k.debug && k.debug.numObjects) ? k.debug.numObjects() : k.get("*", { recursive: true }).length;
+
+    let last = null;
+    let lastObjectSample = -Infinity;
+    const tick = (t) => {
+        const scene = sceneName();
+        if (!nexus.visited.includes(scene)) nexus.visited.push(scene);
+        if (last !== null && nexus.samples < MAX_SAMPLES) {
+            (nexus.frameTimes[scene] = nexus.frameTimes[scene] || []).push(t - last);
+            nexus.samples++;
+            if (nexus.perfStart !== null && nexus.perfFrames.length < MAX_SAMPLES) nexus.perfFrames.push(t - last);
+        }
+        last = t;
+        if (nexus.hooked) {
+            nexus.frames++;
+            if (nexus.frames === SETTLE_FRAMES && window.__nexusSettled) {
+                window.__nexusSettled(nexus.frames);
+            }
+        }
+        if (nexus.k && t - lastObjectSample >= OBJECT_SAMPLE_MS) {
+            lastObjectSample = t;
+            try { nexus.objects.push(objectCount(nexus.k)); } catch (e) {}
+        }
+        requestAnimationFrame(tick);
+    };
+    requestAnimationFrame(tick);
+
+    let real;
+    Object.defineProperty(window, "kaplay", {
+        configurable: true,
+        get() { return real; },
+        set(fn) {
+            if (typeof fn !== "function") { real = fn; return; }
+            real = function (...args) {
+                const k = fn.apply(this, args);
+                try {
+                    const origScene = k.scene;
+                    const scene = function (name, def) {
+                        nexus.scenes[name] = typeof def === "function" ? def.length : 0;
+                        return origScene.apply(this, arguments);
+                    };
+                    k.scene = scene;
+                    if (window.scene === origScene) window.scene = scene;
+                    nexus.k = k;
+                    nexus.hooked = true;
+                } catch (e) {}
+                return k;
+            };
+        },
+    });
+})();
+"""
+
+
+@dataclass
+class SceneStats:
+    """Per-scene results from an interactive playtest."""
+    name: str
+    frames: int = 0
+    fps: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    errors: list[str] = field(default_factory=list)
+    forced: bool = False
+
+    @property
+    def summary(self) -> str:
+        how = "entered directly" if self.forced else "reached by play"
+        perf = f"{self.fps:.0f} fps, frame time p50 {self.p50_ms:.1f} / p95 {self.p95_ms:.1f} / p99 {self.p99_ms:.1f} ms"
+        errors = f", {len(self.errors)} errors" if self.errors else ""
+        return f"{self.name} ({how}): {self.frames} frames, {perf}{errors}"
+
+
+FRAME_BUCKETS_MS = (16.7, 33.3, 50.0, 100.0)
+
+
+@dataclass
+class PerfReport:
+    """Runtime performance profile of a playtest."""
+    fps: float = 0.0
+    frames: int = 0
+    frame_histogram: dict[str, int] = field(default_factory=dict)
+    heap_mb: list[float] = field(default_factory=list)
+    heap_growth_mb: float = 0.0
+    long_tasks: int = 0
+    longest_task_ms: float = 0.0
+    max_objects: int = 0
+    final_objects: int = 0
+    violations: list[str] = field(default_factory=list)
+
+    @property
+    def summary(self) -> str:
+        histogram = ", ".join(f"{bucket}: {count}" for bucket, count in self.frame_histogram.items())
+        heap = f"{self.heap_mb[0]:.1f} → {self.heap_mb[-1]:.1f} MB (growth {self.heap_growth_mb:+.1f} MB)" if self.heap_mb else "not sampled"
+        lines = [
+            f"PERFORMANCE: {self.fps:.0f} fps over {self.frames} frames",
+            f"  - frame times: {histogram or 'none'}",
+            f"  - JS heap: {heap}",
+            f"  - long tasks: {self.long_tasks} (longest {self.longest_task_ms:.0f} ms)",
+            f"  - game objects: peak {self.max_objects}, final {self.final_objects}",
+        ]
+        if self.violations:
+            lines.append(f"PERF FAILURES ({len(self.violations)}):")
+            lines.extend(f"  - {v}" for v in self.violations)
+        return "\n".join(lines)
+
 
 @dataclass
 class PlaytestResult:
@@ -21,6 +196,16 @@ class PlaytestResult:
     console_warnings: list[str] = field(default_factory=list)
     console_logs: list[str] = field(default_factory=list)
     success: bool = True
+    frames: int = 0
+    elapsed_ms: int = 0
+    scenes: dict[str, SceneStats] = field(default_factory=dict)
+    skipped_scenes: list[str] = field(default_factory=list)
+    perf: PerfReport | None = None
+
+    @property
+    def failures(self) -> list[str]:
+        """Everything that blocks shipping: runtime errors and perf threshold breaches."""
+        return self.errors + (self.perf.violations if self.perf else [])
 
     @property
     def summary(self) -> str:
@@ -35,70 +220,359 @@ class PlaytestResult:
                 lines.append(f"  - {w}")
         if not self.errors and not self.console_warnings:
             lines.append("No errors or warnings detected.")
+        if self.scenes:
+            lines.append(f"SCENES ({len(self.scenes)} played):")
+            for stats in self.scenes.values():
+                lines.append(f"  - {stats.summary}")
+        if self.skipped_scenes:
+            lines.append(f"  (not entered directly, need arguments: {', '.join(self.skipped_scenes)})")
+        if self.perf:
+            lines.append(self.perf.summary)
         return "\n".join(lines)
 
 
-async def run_game_headless(html_source: str, wait_ms: int = 5000) -> PlaytestResult:
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def scene_stats(name: str, frame_times: list[float], errors: list[str], forced: bool) -> SceneStats:
+    """Summarize one scene's requestAnimationFrame deltas."""
+    ordered = sorted(frame_times)
+    mean = statistics.fmean(ordered) if ordered else 0.0
+    return SceneStats(
+        name=name,
+        frames=len(ordered),
+        fps=1000 / mean if mean else 0.0,
+        p50_ms=_percentile(ordered, 50),
+        p95_ms=_percentile(ordered, 95),
+        p99_ms=_percentile(ordered, 99),
+        errors=errors,
+        forced=forced,
+    )
+
+
+def _heap_growth(samples: list[float]) -> float:
+    """Growth between the low points of the first and last third of the run.
+
+    Comparing minima rather than endpoints keeps GC sawtooth from
+    reading as a leak (or hiding one).
+    """
+    if len(samples) < 3:
+        return samples[-1] - samples[0] if len(samples) == 2 else 0.0
+    third = len(samples) // 3
+    return min(samples[-third:]) - min(samples[:third])
+
+
+def perf_report(frame_times: list[float], heap_mb: list[float], long_tasks: list[float], objects: list[int]) -> PerfReport:
+    """Build the perf profile and check it against the settings.perf_* thresholds (0 disables a check)."""
+    mean = statistics.fmean(frame_times) if frame_times else 0.0
+    histogram = {f"≤{bound:g}ms": 0 for bound in FRAME_BUCKETS_MS}
+    histogram[f">{FRAME_BUCKETS_MS[-1]:g}ms"] = 0
+    for dt in frame_times:
+        bucket = next((f"≤{bound:g}ms" for bound in FRAME_BUCKETS_MS if dt <= bound), f">{FRAME_BUCKETS_MS[-1]:g}ms")
+        histogram[bucket] += 1
+
+    report = PerfReport(
+        fps=1000 / mean if mean else 0.0,
+        frames=len(frame_times),
+        frame_histogram=histogram,
+        heap_mb=heap_mb,
+        heap_growth_mb=_heap_growth(heap_mb),
+        long_tasks=len(long_tasks),
+        longest_task_ms=max(long_tasks, default=0.0),
+        max_objects=max(objects, default=0),
+        final_objects=objects[-1] if objects else 0,
+    )
+
+    # Too few frames to judge the frame rate (e.g. the run ended on an early error)
+    if settings.perf_min_fps and report.frames >= 30 and report.fps < settings.perf_min_fps:
+        report.violations.append(f"Frame rate too low: {report.fps:.0f} fps (minimum {settings.perf_min_fps:g})")
+    if settings.perf_max_heap_growth_mb and report.heap_growth_mb > settings.perf_max_heap_growth_mb:
+        report.violations.append(f"JS heap grew {report.heap_growth_mb:.1f} MB during the playtest (limit {settings.perf_max_heap_growth_mb:g} MB); check for per-frame allocations")
+    if settings.perf_max_long_tasks and report.long_tasks > settings.perf_max_long_tasks:
+        report.violations.append(f"{report.long_tasks} long tasks (>50 ms) blocked the main thread (limit {settings.perf_max_long_tasks})")
+    if settings.perf_max_objects and report.max_objects > settings.perf_max_objects:
+        report.violations.append(f"{report.max_objects} live game objects at peak (limit {settings.perf_max_objects}); destroy off-screen objects or cap spawning")
+    return report
+
+
+async def _heap_mb(cdp) -> float | None:
+    metrics = await cdp.send("Performance.getMetrics")
+    used = next((m["value"] for m in metrics["metrics"] if m["name"] == "JSHeapUsedSize"), None)
+    return used / 2**20 if used is not None else None
+
+
+async def _sample_heap(cdp, samples: list[float]) -> None:
+    """Poll the JS heap size over CDP until cancelled or the page goes away."""
+    try:
+        await cdp.send("Performance.enable")
+        while True:
+            used = await _heap_mb(cdp)
+            if used is not None:
+                samples.append(used)
+            await asyncio.sleep(settings.perf_sample_ms / 1000)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        log.warning(f"Heap sampling stopped: {e}")
+
+
+async def _start_profiling(page, context, heap_mb: list[float]) -> tuple:
+    """Mark the profiling baseline in the page and start polling the heap from there."""
+    await page.evaluate("() => { if (window.__nexus) window.__nexus.perfStart = performance.now(); }")
+    cdp = await context.new_cdp_session(page)
+    return cdp, asyncio.create_task(_sample_heap(cdp, heap_mb))
+
+
+async def _collect_perf(page, cdp, heap_task: asyncio.Task, heap_mb: list[float]) -> PerfReport:
+    heap_task.cancel()
+    try:
+        await heap_task
+    except asyncio.CancelledError:
+        pass
+    try:
+        used = await _heap_mb(cdp)
+        if used is not None:
+            heap_mb.append(used)
+    except Exception:
+        pass
+    data = await page.evaluate("""() => window.__nexus
+        ? { frameTimes: window.__nexus.perfFrames, longTasks: window.__nexus.longTasks, objects: window.__nexus.objects }
+        : { frameTimes: [], longTasks: [], objects: [] }""")
+    return perf_report(data["frameTimes"], heap_mb, data["longTasks"], data["objects"])
+
+
+def _cdn_cache_path(url: str) -> Path:
+    """Map a CDN URL to a stable file name in the local cache directory."""
+    digest = hashlib.sha256(url.encode()).hexdigest()[:16]
+    name = Path(urlparse(url).path).name or "index"
+    return Path(settings.kaplay_cache_dir) / f"{digest}_{name}"
+
+
+async def _fulfill_from_cdn_cache(route: Route) -> None:
+    """Serve a CDN asset from memory or disk, fetching it once on a miss."""
+    url = route.request.url
+    cached = _cdn_assets.get(url)
+
+    if cached is None:
+        path = _cdn_cache_path(url)
+        meta = path.with_suffix(path.suffix + ".type")
+        if path.exists():
+            content_type = meta.read_text() if meta.exists() else "application/javascript"
+            cached = (path.read_bytes(), content_type)
+        else:
+            try:
+                response = await route.fetch()
+            except Exception as e:
+                log.warning(f"CDN fetch failed for {url}: {e}")
+                await route.abort()
+                return
+            if not response.ok:
+                await route.fulfill(response=response)
+                return
+            content_type = response.headers.get("content-type", "application/javascript")
+            cached = (await response.body(), content_type)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(cached[0])
+            meta.write_text(content_type)
+            log.info(f"Cached CDN asset {url} → {path}")
+        _cdn_assets[url] = cached
+
+    body, content_type = cached
+    await route.fulfill(status=200, body=body, content_type=content_type)
+
+
+async def _canvas_point(page, fx: float, fy: float) -> tuple[float, float]:
+    box = await page.evaluate("""() => {
+        const c = document.querySelector("canvas");
+        if (!c) return null;
+        const r = c.getBoundingClientRect();
+        return { x: r.x, y: r.y, width: r.width, height: r.height };
+    }""")
+    if not box:
+        size = page.viewport_size or {"width": 800, "height": 600}
+        box = {"x": 0, "y": 0, **size}
+    return box["x"] + box["width"] * fx, box["y"] + box["height"] * fy
+
+
+async def _run_steps(page, steps: list[Step]) -> None:
+    """Replay one list of scripted input steps."""
+    for step in steps:
+        kind = step[0]
+        if kind == "press":
+            for _ in range(step[2]):
+                await page.keyboard.press(step[1])
+        elif kind == "hold":
+            await page.keyboard.down(step[1])
+            await page.wait_for_timeout(step[2])
+            await page.keyboard.up(step[1])
+        elif kind == "click":
+            await page.mouse.click(*await _canvas_point(page, step[1], step[2]))
+        elif kind == "move":
+            await page.mouse.move(*await _canvas_point(page, step[1], step[2]), steps=5)
+        elif kind == "type":
+            await page.keyboard.type(step[1], delay=40)
+        elif kind == "wait":
+            await page.wait_for_timeout(step[1])
+
+
+async def _play(page, game_type: str | None, result: PlaytestResult) -> None:
+    """Drive the game with scripted inputs and walk its scenes, then collect per-scene stats."""
+    script = play_script(game_type)
+    await _run_steps(page, script.start + script.play)
+
+    nexus = await page.evaluate("() => ({ scenes: window.__nexus.scenes, visited: window.__nexus.visited })")
+    forced = []
+    for name, arity in list(nexus["scenes"].items())[:settings.playtest_max_scenes]:
+        if name in nexus["visited"]:
+            continue
+        if arity > 0:
+            result.skipped_scenes.append(name)
+            continue
+        log.info(f"Entering scene '{name}' directly")
+        await page.evaluate("name => window.__nexus.k.go(name)", name)
+        await page.wait_for_timeout(200)
+        await _run_steps(page, script.play)
+        forced.append(name)
+
+    data = await page.evaluate("() => ({ frameTimes: window.__nexus.frameTimes, errors: window.__nexus.errors })")
+    errors_by_scene: dict[str, list[str]] = {}
+    for err in data["errors"]:
+        errors_by_scene.setdefault(err["scene"], []).append(err["message"])
+    for name, frame_times in data["frameTimes"].items():
+        result.scenes[name] = scene_stats(name, frame_times, errors_by_scene.get(name, []), name in forced)
+
+
+async def run_game_headless(
+    html_source: str,
+    wait_ms: int = 5000,
+    adaptive: bool = True,
+    settle_frames: int | None = None,
+    game_type: str | None = None,
+    interactive: bool | None = None,
+    profile: bool | None = None,
+) -> PlaytestResult:
     """Load game HTML in headless Chromium and capture startup errors.
 
     Args:
         html_source: The full HTML string of the game.
         wait_ms: How long to let the page run before collecting results.
+            In adaptive mode this is only the upper bound.
+        adaptive: Return early on the first uncaught page error, or once
+            the game loop has run ``settle_frames`` frames cleanly.
+        settle_frames: Clean frames required to end early. Defaults to
+            ``settings.playtest_settle_frames``.
+        game_type: Template type, selecting the scripted inputs.
+        interactive: Play the game after it settles cleanly. Defaults to
+            ``settings.playtest_interactive``.
+        profile: Collect a PerfReport. Defaults to ``settings.perf_enabled``.
 
     Returns:
         PlaytestResult with captured errors, warnings, and logs.
     """
     result = PlaytestResult()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    failed = asyncio.Event()
+    settled = asyncio.Event()
+    if settle_frames is None:
+        settle_frames = settings.playtest_settle_frames
+    if interactive is None:
+        interactive = settings.playtest_interactive
+    if profile is None:
+        profile = settings.perf_enabled
+    heap_mb: list[float] = []
 
-    # Write HTML to a temp file
-    tmp = tempfile.NamedTemporaryFile(
-        suffix=".html", delete=False, mode="w", encoding="utf-8"
-    )
-    try:
-        tmp.write(html_source)
-        tmp.close()
-        file_url = f"file://{os.path.abspath(tmp.name)}"
+    async def _route(route: Route) -> None:
+        url = route.request.url
+        if url.startswith(PLAYTEST_ORIGIN):
+            await route.fulfill(status=200, body=html_source, content_type="text/html; charset=utf-8")
+        elif urlparse(url).hostname in CDN_HOSTS:
+            await _fulfill_from_cdn_cache(route)
+        else:
+            await route.continue_()
 
-        log.info(f"Launching headless browser → {file_url}")
+    log.info(f"Opening playtest page → {PLAYTEST_URL} ({len(html_source)} chars)")
 
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
+    async with browser_pool.context() as context:
+        await context.route("**/*", _route)
+        page = await context.new_page()
 
-            # Capture uncaught page errors (thrown exceptions, syntax errors)
-            page.on("pageerror", lambda err: result.errors.append(str(err)))
+        if adaptive or interactive or profile:
+            hook = KAPLAY_HOOK_JS % {"settle_frames": settle_frames, "sample_ms": settings.perf_sample_ms}
+            await page.add_init_script(script=hook)
+            await page.expose_function("__nexusSettled", lambda frames: settled.set())
 
-            # Capture console messages
-            def _on_console(msg):
-                text = msg.text
-                if msg.type == "error":
-                    result.errors.append(text)
-                elif msg.type == "warning":
-                    result.console_warnings.append(text)
-                else:
-                    result.console_logs.append(text)
+        # Capture uncaught page errors (thrown exceptions, syntax errors)
+        def _on_pageerror(err):
+            result.errors.append(str(err))
+            failed.set()
 
-            page.on("console", _on_console)
+        page.on("pageerror", _on_pageerror)
 
-            # Navigate and wait for the page to settle
-            try:
-                await page.goto(file_url, wait_until="load", timeout=15000)
-            except Exception as e:
-                result.errors.append(f"Page failed to load: {e}")
-                result.success = False
+        # Capture console messages
+        def _on_console(msg):
+            text = msg.text
+            if msg.type == "error":
+                result.errors.append(text)
+            elif msg.type == "warning":
+                result.console_warnings.append(text)
+            else:
+                result.console_logs.append(text)
 
-            # Let the game run for a bit to catch async/runtime errors
+        page.on("console", _on_console)
+
+        # Navigate and wait for the page to settle
+        try:
+            await page.goto(PLAYTEST_URL, wait_until="load", timeout=15000)
+        except Exception as e:
+            result.errors.append(f"Page failed to load: {e}")
+            result.success = False
+            failed.set()
+
+        # Let the game run for a bit to catch async/runtime errors
+        if adaptive:
+            waiters = [asyncio.create_task(failed.wait()), asyncio.create_task(settled.wait())]
+            await asyncio.wait(waiters, timeout=wait_ms / 1000, return_when=asyncio.FIRST_COMPLETED)
+            for task in waiters:
+                task.cancel()
+            try:
+                result.frames = await page.evaluate("window.__nexus ? window.__nexus.frames : 0")
+            except Exception:
+                pass
+        else:
             await page.wait_for_timeout(wait_ms)
 
-            await browser.close()
+        # Profile from here on: load and startup are behind us
+        cdp = heap_task = None
+        if profile and not failed.is_set():
+            try:
+                cdp, heap_task = await _start_profiling(page, context, heap_mb)
+            except Exception as e:
+                log.warning(f"Profiling not started: {e}")
+
+        if interactive and not failed.is_set():
+            try:
+                await _play(page, game_type, result)
+            except Exception as e:
+                log.warning(f"Scripted play aborted: {e}")
 
-        result.success = len(result.errors) == 0
+        if heap_task is not None:
+            try:
+                result.perf = await _collect_perf(page, cdp, heap_task, heap_mb)
+            except Exception as e:
+                log.warning(f"Perf collection failed: {e}")
 
-    finally:
-        os.unlink(tmp.name)
+    result.success = len(result.errors) == 0
 
+    result.elapsed_ms = int((loop.time() - started) * 1000)
     error_count = len(result.errors)
     warn_count = len(result.console_warnings)
-    log.info(f"Playtest complete → {error_count} errors, {warn_count} warnings")
+    log.info(f"Playtest complete → {error_count} errors, {warn_count} warnings, {result.frames} frames, {len(result.scenes)} scenes in {result.elapsed_ms}ms")
+    if result.perf:
+        log.info(f"Playtest perf → {result.perf.fps:.0f} fps, heap {result.perf.heap_growth_mb:+.1f} MB, {result.perf.long_tasks} long tasks, peak {result.perf.max_objects} objects, {len(result.perf.violations)} threshold breaches")
 
     return result
@@ -0,0 +1,34 @@
+"""Durable LangGraph checkpointing so interrupted runs can be resumed.
+
+The graph's state is written to SQLite after every node, keyed by the
+run's thread_id (the game_id). If the process dies or a node raises, a
+later run on the same thread picks up after the last completed node.
+"""
+
+from pathlib import Path
+
+import aiosqlite
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from utils.logger import get_logger
+
+log = get_logger("checkpoint")
+
+
+async def open_checkpointer(path: str) -> AsyncSqliteSaver:
+    """Open (creating if needed) the SQLite checkpoint store at path."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    conn = await aiosqlite.connect(path)
+    saver = AsyncSqliteSaver(conn)
+    await saver.setup()
+    log.info(f"Checkpoint store ready → {path}")
+    return saver
+
+
+async def close_checkpointer(saver: AsyncSqliteSaver) -> None:
+    await saver.conn.close()
+
+
+def thread_config(game_id: str) -> dict:
+    """Graph config that scopes checkpoints to one game."""
+    return {"configurable": {"thread_id": game_id}}
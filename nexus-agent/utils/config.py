@@ -1,5 +1,7 @@
 """Pydantic settings for project configuration."""
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -12,9 +14,76 @@ class Settings(BaseSettings):
     max_design_iterations: int = 3
     max_code_iterations: int = 2
 
+    # Fan-out design: plan and evaluate this many candidates concurrently
+    design_candidates: int = 1
+    design_candidate_types: list[str] = ["platformer", "quizrunner", "maze", "shootemup"]
+    # Race the coder on the top two candidate designs and keep the first to ship
+    coder_race: bool = False
+
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = "data/llm_cache.sqlite3"
+    llm_cache_ttl_s: int = 7 * 24 * 3600
+    llm_cache_max_mb: int = 512
+
+    checkpoint_enabled: bool = True
+    checkpoint_path: str = "data/checkpoints.sqlite3"
+
     output_dir: str = "output"
     chroma_db_dir: str = "data/chroma_db"
 
+    job_concurrency: int = 4
+    job_queue_size: int = 32
+    job_history_size: int = 500
+
+    supabase_flush_interval_s: float = 1.0
+    supabase_max_retries: int = 4
+    supabase_backoff_s: float = 0.5
+    supabase_max_requeues: int = 5
+
+    browser_pool_size: int = 2
+    browser_max_pages: int = 8
+    browser_max_uses: int = 50
+
+    coder_progress_interval_s: float = 1.0
+    coder_patch_mode: bool = True
+    tool_timeout_s: float = 20.0
+
+    rag_cache_size: int = 512
+    rag_cache_ttl_s: float = 6 * 60 * 60
+    rag_version_check_s: float = 30.0
+    # Startup docs warm-up is retried with exponential backoff until it succeeds
+    rag_warmup_backoff_s: float = 2.0
+    rag_warmup_max_backoff_s: float = 60.0
+
+    playtest_settle_frames: int = 90
+    # Scripted play after a clean start (tools/play_scripts.py)
+    playtest_interactive: bool = True
+    playtest_max_scenes: int = 6
+    # Runtime profiling; a breached threshold blocks shipping like a runtime error (0 disables a check)
+    perf_enabled: bool = True
+    perf_sample_ms: int = 500
+    perf_min_fps: float = 30.0
+    perf_max_heap_growth_mb: float = 25.0
+    perf_max_long_tasks: int = 5
+    perf_max_objects: int = 1500
+    # Static pre-flight (tools/html_validator.analyze_game) before the browser playtest
+    static_check_enabled: bool = True
+    # When game_player calls the LLM: "always" | "short_circuit" | "two_phase" (see nodes/game_player.py)
+    player_eval_policy: Literal["always", "short_circuit", "two_phase"] = "two_phase"
+    kaplay_cache_dir: str = "data/kaplay_cache"
+
+    # Re-read prompts/templates when their files change (dev only)
+    prompt_hot_reload: bool = False
+
+    # Estimated-token budgets for each node's user prompt (see utils/prompt_budget.py)
+    prompt_budgets: dict[str, int] = {
+        "game_planner": 8_000,
+        "design_evaluator": 12_000,
+        "implementation_planner": 24_000,
+        "game_coder": 48_000,
+        "game_player": 32_000,
+    }
+
     class Config:
         env_file = ".env.local"
         env_file_encoding = "utf-8"
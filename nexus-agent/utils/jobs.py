@@ -0,0 +1,193 @@
+"""In-process background job queue for long-running graph runs.
+
+Jobs are accepted immediately and executed by a fixed pool of asyncio
+workers. The pending queue is bounded so a burst of submissions is
+rejected up front instead of piling up behind slow LLM calls. Only one
+job per game may be queued or running at a time, since jobs for the
+same game share its checkpoint thread.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Literal
+
+from utils.logger import get_logger
+
+log = get_logger("jobs")
+
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the pending queue is at capacity."""
+
+
+class JobConflictError(Exception):
+    """Raised when a job is submitted for a game that already has a queued or running job."""
+
+
+@dataclass
+class Job:
+    """A single unit of background work and its outcome."""
+    id: str
+    game_id: str
+    fn: Callable[[], Awaitable[Any]] = field(repr=False)
+    status: JobStatus = "queued"
+    result: Any = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    cancel_requested: bool = False
+    _task: asyncio.Task | None = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "game_id": self.game_id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """Bounded FIFO queue drained by a fixed number of concurrent workers.
+
+    Args:
+        concurrency: Number of jobs allowed to run at the same time.
+        max_queued: Maximum number of jobs waiting for a worker.
+        max_history: Number of finished jobs kept around for status polling.
+    """
+
+    def __init__(self, concurrency: int, max_queued: int, max_history: int = 500):
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        self.max_history = max_history
+        self._queue: asyncio.Queue[Job] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+
+    async def start(self) -> None:
+        """Spawn the worker tasks. Must be called from a running event loop."""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"job-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        log.info(f"[blue]Jobs[/blue] | started {self.concurrency} workers (queue depth {self.max_queued})")
+
+    async def stop(self) -> None:
+        """Cancel all workers. Running jobs are interrupted."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def submit(self, game_id: str, fn: Callable[[], Awaitable[Any]]) -> Job:
+        """Enqueue a coroutine factory and return its job handle.
+
+        Raises:
+            JobConflictError: If the game already has a queued or running job.
+            QueueFullError: If the pending queue is already at capacity.
+            RuntimeError: If the queue has not been started.
+        """
+        if self._queue is None:
+            raise RuntimeError("JobQueue.start() must be called before submitting jobs")
+        active = self.active(game_id)
+        if active is not None:
+            raise JobConflictError(f"Game {game_id} already has a {active.status} job ({active.id})")
+
+        job = Job(id=uuid.uuid4().hex, game_id=game_id, fn=fn)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Job queue is full ({self.max_queued} pending)")
+
+        self._jobs[job.id] = job
+        self._evict_history()
+        log.info(f"[blue]Jobs[/blue] | queued {job.id} for game {game_id} ({self._queue.qsize()} pending)")
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        """Look up a job by ID."""
+        return self._jobs.get(job_id)
+
+    def active(self, game_id: str) -> Job | None:
+        """The game's queued or running job, if any."""
+        return next((job for job in self._jobs.values() if job.game_id == game_id and not job.finished), None)
+
+    def cancel(self, job_id: str) -> Job | None:
+        """Cancel a queued or running job. Finished jobs are left untouched."""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.cancel_requested = True
+        if job._task is not None:
+            job._task.cancel()
+        elif job.status == "queued":
+            # Never started: finish it now so the game is free again; the worker skips it
+            job.status = "cancelled"
+            job.finished_at = time.time()
+        log.info(f"[blue]Jobs[/blue] | cancel requested for {job.id}")
+        return job
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    @property
+    def running(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == "running")
+
+    def _evict_history(self) -> None:
+        """Drop the oldest finished jobs once history exceeds max_history."""
+        finished = [jid for jid, job in self._jobs.items() if job.finished]
+        for jid in finished[: max(0, len(finished) - self.max_history)]:
+            del self._jobs[jid]
+
+    async def _worker(self, index: int) -> None:
+        assert self._queue is not None
+        while True:
+            job = await self._queue.get()
+            if job.cancel_requested:
+                job.status = "cancelled"
+                job.finished_at = time.time()
+                self._queue.task_done()
+                continue
+            job.status = "running"
+            job.started_at = time.time()
+            log.info(f"[blue]Jobs[/blue] | worker {index} running {job.id}")
+            try:
+                job._task = asyncio.create_task(job.fn())
+                job.result = await job._task
+                job.status = "succeeded"
+            except asyncio.CancelledError:
+                job.error = "Cancelled"
+                # Only swallow cancellation aimed at this job, not at the worker itself
+                if job.cancel_requested and not asyncio.current_task().cancelling():
+                    job.status = "cancelled"
+                    continue
+                job.status = "failed"
+                raise
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                log.error(f"[red]Jobs[/red] | job {job.id} failed: {e}")
+            finally:
+                job.finished_at = time.time()
+                job._task = None
+                self._queue.task_done()
@@ -1,8 +1,13 @@
 """LLM client factory — routes each node to the appropriate Gemini model."""
 
+import json
+from typing import AsyncIterator, Sequence
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, message_chunk_to_message
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 from utils.config import settings
+from utils.llm_cache import ResponseCache, cache_bypassed, cache_key
 
 MODEL_MAP: dict[str, str] = {
     "game_planner": "gemini-3-flash-preview",
@@ -28,11 +33,108 @@ def extract_text(content) -> str:
     return str(content)
 
 
-def get_llm(node_name: str) -> ChatGoogleGenerativeAI:
-    """Return a ChatGoogleGenerativeAI client configured for the given node."""
+# Clients are keyed by model so nodes that share a model also share its
+# underlying HTTP session.
+_clients: dict[str, ChatGoogleGenerativeAI] = {}
+
+response_cache = ResponseCache(
+    path=settings.llm_cache_path,
+    ttl_s=settings.llm_cache_ttl_s,
+    max_bytes=settings.llm_cache_max_mb * 1024 * 1024,
+)
+
+
+class CachedChatModel:
+    """Chat model wrapper that answers repeated calls from the response cache.
+
+    Only ``bind_tools``, ``ainvoke`` and ``astream`` are exposed, which
+    is all the nodes use. The cache key covers the model, the full
+    message list, and the bound tools.
+    """
+
+    def __init__(self, node_name: str, model: str, client: ChatGoogleGenerativeAI, runnable=None, tools: Sequence = ()):
+        self.node_name = node_name
+        self.model = model
+        self.client = client
+        self.tools = tuple(tools)
+        self._runnable = runnable if runnable is not None else client
+
+    def bind_tools(self, tools: Sequence, **kwargs) -> "CachedChatModel":
+        return CachedChatModel(
+            self.node_name, self.model, self.client,
+            runnable=self.client.bind_tools(tools, **kwargs),
+            tools=tools,
+        )
+
+    def _cache_enabled(self) -> bool:
+        return settings.llm_cache_enabled and not cache_bypassed()
+
+    async def ainvoke(self, messages: Sequence[BaseMessage], **kwargs) -> AIMessage:
+        key = None
+        if self._cache_enabled():
+            key = cache_key(self.model, messages, self.tools)
+            cached = await response_cache.get(key, self.node_name)
+            if cached is not None:
+                return cached
+
+        response = await self._runnable.ainvoke(messages, **kwargs)
+
+        if key is not None:
+            await response_cache.put(key, response)
+        return response
+
+    async def astream(self, messages: Sequence[BaseMessage], **kwargs) -> AsyncIterator[AIMessageChunk]:
+        """Stream response chunks; a cache hit is replayed as a single chunk.
+
+        The aggregated message is written to the cache once the stream
+        completes, so an interrupted stream is never cached.
+        """
+        key = None
+        if self._cache_enabled():
+            key = cache_key(self.model, messages, self.tools)
+            cached = await response_cache.get(key, self.node_name)
+            if cached is not None:
+                yield AIMessageChunk(
+                    content=cached.content,
+                    tool_call_chunks=[
+                        {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                        for i, c in enumerate(getattr(cached, "tool_calls", []))
+                    ],
+                )
+                return
+
+        aggregate: AIMessageChunk | None = None
+        async for chunk in self._runnable.astream(messages, **kwargs):
+            aggregate = chunk if aggregate is None else aggregate + chunk
+            yield chunk
+
+        if key is not None and aggregate is not None:
+            await response_cache.put(key, message_chunk_to_message(aggregate))
+
+
+def _get_client(model: str) -> ChatGoogleGenerativeAI:
+    client = _clients.get(model)
+    if client is None:
+        client = ChatGoogleGenerativeAI(
+            model=model,
+            google_api_key=settings.gemini_api_key,
+            max_output_tokens=settings.max_tokens,
+        )
+        _clients[model] = client
+    return client
+
+
+def get_llm(node_name: str) -> CachedChatModel:
+    """Return a cache-aware chat model for the given node.
+
+    The underlying ChatGoogleGenerativeAI client is created once per
+    model and reused across nodes, loop iterations, and requests.
+    """
     model = MODEL_MAP.get(node_name, settings.default_model)
-    return ChatGoogleGenerativeAI(
-        model=model,
-        google_api_key=settings.gemini_api_key,
-        max_output_tokens=settings.max_tokens,
-    )
+    return CachedChatModel(node_name, model, _get_client(model))
+
+
+def warm_up_llms() -> None:
+    """Eagerly create a client for every routed node."""
+    for model in set(MODEL_MAP.values()):
+        _get_client(model)
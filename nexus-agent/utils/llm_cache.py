@@ -0,0 +1,166 @@
+"""Content-addressed, disk-backed cache for full LLM responses.
+
+Responses are keyed on the model name, the rendered message list, and
+the tools bound to the model, so an identical node call (same prompt,
+same tool results so far) is answered from disk. Entries expire after
+a TTL and the least recently used entries are evicted once the store
+grows past its size limit.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Iterator, Sequence
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+from utils.logger import get_logger
+
+log = get_logger("llm_cache")
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_cache() -> Iterator[None]:
+    """Skip cache reads and writes for LLM calls made inside this block.
+
+    The flag is a context variable, so it also applies to tasks spawned
+    from inside the block (e.g. the nodes of a graph run).
+    """
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def cache_bypassed() -> bool:
+    return _bypass.get()
+
+
+def _tool_spec(tool) -> dict:
+    return {
+        "name": getattr(tool, "name", str(tool)),
+        "description": getattr(tool, "description", ""),
+        "args": getattr(tool, "args", {}),
+    }
+
+
+def cache_key(model: str, messages: Sequence[BaseMessage], tools: Sequence = ()) -> str:
+    """Hash model + rendered messages + bound tool specs into a cache key."""
+    payload = {
+        "model": model,
+        "messages": [message_to_dict(m) for m in messages],
+        "tools": [_tool_spec(t) for t in tools],
+    }
+    blob = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class ResponseCache:
+    """SQLite store of serialized AI messages with TTL and size-based LRU eviction.
+
+    Args:
+        path: SQLite database file.
+        ttl_s: Seconds an entry stays valid after it is written.
+        max_bytes: Upper bound on the total size of stored responses.
+    """
+
+    def __init__(self, path: str, ttl_s: int, max_bytes: int):
+        self.path = Path(path)
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.stats: Counter[str] = Counter()
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses(accessed_at)")
+        return self._conn
+
+    def _get(self, key: str) -> BaseMessage | None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_s:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                self.stats["expired"] += 1
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+        return messages_from_dict([json.loads(value)])[0]
+
+    def _put(self, key: str, message: BaseMessage) -> None:
+        value = json.dumps(message_to_dict(message), default=str)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        cur = conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_s,))
+        self.stats["expired"] += cur.rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self.stats["evicted"] += len(victims)
+
+    async def get(self, key: str, node_name: str = "") -> BaseMessage | None:
+        """Return the cached response for key, recording a hit or miss."""
+        message = await asyncio.to_thread(self._get, key)
+        outcome = "hits" if message is not None else "misses"
+        self.stats[outcome] += 1
+        if node_name:
+            self.stats[f"{node_name}.{outcome}"] += 1
+        return message
+
+    async def put(self, key: str, message: BaseMessage) -> None:
+        await asyncio.to_thread(self._put, key, message)
+        self.stats["writes"] += 1
+
+    def metrics(self) -> dict:
+        """Hit/miss counters plus the overall hit rate."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **dict(self.stats),
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+        }
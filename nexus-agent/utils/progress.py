@@ -0,0 +1,148 @@
+"""In-process progress bus for live generation updates.
+
+Nodes and the graph runner publish small event dicts keyed by game_id.
+Any number of subscribers (e.g. SSE responses) receive each event on
+their own queue. Publishing never blocks: if a subscriber falls too far
+behind, its oldest events are dropped.
+
+A short history of each game's events is kept so a client that connects
+mid-run first sees what already happened. Only the most recent
+``progress`` event is kept, since each one supersedes the last.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, defaultdict, deque
+
+from utils.logger import get_logger
+
+log = get_logger("progress")
+
+TERMINAL_EVENTS = {"done", "failed"}
+
+
+class Subscription:
+    """A subscriber's view of one game's events. Use as a context manager."""
+
+    def __init__(self, bus: "ProgressBus", game_id: str, max_queue: int):
+        self._bus = bus
+        self.game_id = game_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+    async def get(self) -> dict:
+        """Wait for the next event. Safe to cancel (e.g. via asyncio.wait_for)."""
+        return await self.queue.get()
+
+    def put(self, event: dict) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    def close(self) -> None:
+        self._bus._unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ProgressBus:
+    """Fan-out of progress events to per-game subscriber queues.
+
+    Args:
+        max_queue: Events buffered per subscriber before the oldest are dropped.
+        max_history: Non-progress events remembered per game for replay.
+        max_games: Games whose history is kept before the oldest is forgotten.
+    """
+
+    def __init__(self, max_queue: int = 256, max_history: int = 100, max_games: int = 256):
+        self.max_queue = max_queue
+        self.max_history = max_history
+        self.max_games = max_games
+        self._subscribers: dict[str, set[Subscription]] = defaultdict(set)
+        self._history: OrderedDict[str, deque] = OrderedDict()
+        self._latest_progress: dict[str, dict] = {}
+
+    def publish(self, game_id: str, event: dict) -> None:
+        """Send an event to every subscriber of game_id. No-op without a game_id."""
+        if not game_id:
+            return
+        event = {"ts": time.time(), "game_id": game_id, **event}
+        self._remember(game_id, event)
+        for sub in self._subscribers.get(game_id, ()):
+            sub.put(event)
+
+    def subscribe(self, game_id: str, replay: bool = True) -> Subscription:
+        """Register a subscriber, pre-loaded with the game's recent history."""
+        sub = Subscription(self, game_id, self.max_queue)
+        if replay:
+            for event in self.history(game_id):
+                sub.put(event)
+        self._subscribers[game_id].add(sub)
+        return sub
+
+    def reset(self, game_id: str) -> None:
+        """Forget a game's history, e.g. before it is generated again."""
+        self._history.pop(game_id, None)
+        self._latest_progress.pop(game_id, None)
+
+    def history(self, game_id: str) -> list[dict]:
+        events = list(self._history.get(game_id, ()))
+        latest = self._latest_progress.get(game_id)
+        if latest is not None:
+            events.append(latest)
+            events.sort(key=lambda e: e["ts"])
+        return events
+
+    def _remember(self, game_id: str, event: dict) -> None:
+        if event.get("type") == "progress":
+            self._latest_progress[game_id] = event
+            return
+        history = self._history.get(game_id)
+        if history is None:
+            history = self._history[game_id] = deque(maxlen=self.max_history)
+            while len(self._history) > self.max_games:
+                old, _ = self._history.popitem(last=False)
+                self._latest_progress.pop(old, None)
+        self._history.move_to_end(game_id)
+        history.append(event)
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subscribers.get(sub.game_id)
+        if subs is None:
+            return
+        subs.discard(sub)
+        if not subs:
+            del self._subscribers[sub.game_id]
+
+
+class ThrottledProgress:
+    """Publishes at most one progress event per interval for a single game.
+
+    Args:
+        game_id: Game the events belong to.
+        node_name: Node reported in each event.
+        interval_s: Minimum seconds between published events.
+    """
+
+    def __init__(self, game_id: str, node_name: str, interval_s: float):
+        self.game_id = game_id
+        self.node_name = node_name
+        self.interval_s = interval_s
+        self._last = 0.0
+
+    def ready(self) -> bool:
+        """Whether an update now would be published. Check it before building an expensive payload."""
+        return time.monotonic() - self._last >= self.interval_s
+
+    def update(self, force: bool = False, **fields) -> None:
+        now = time.monotonic()
+        if not force and now - self._last < self.interval_s:
+            return
+        self._last = now
+        progress.publish(self.game_id, {"type": "progress", "node": self.node_name, **fields})
+
+
+progress = ProgressBus()
@@ -0,0 +1,171 @@
+"""Per-node prompt token budgeting and context compaction.
+
+Prompt templates inline large blobs (templates, existing code, the GDD,
+the lesson plan). Before rendering, each variable is measured and, if
+the node's prompt would exceed its budget, the lowest-priority sections
+are compacted until it fits:
+
+1. Lossless-ish cleanup: strip code comments, collapse blank lines and
+   consecutive repeated lines, re-serialize JSON compactly.
+2. Truncation: cut the middle out of a section, lowest priority first.
+
+Code sections are only ever comment-stripped, never truncated: the
+model is asked to review, patch or rewrite that code and must see all
+of it. Sections listed as protected (e.g. code the model must quote
+verbatim in a patch) are never modified at all.
+"""
+
+import json
+import re
+
+from utils.config import settings
+from utils.logger import get_logger
+
+log = get_logger("prompt_budget")
+
+# Rough Gemini ratio for English prose and code
+CHARS_PER_TOKEN = 4
+
+# Higher priority = compacted later. Variables not listed are never touched.
+SECTION_PRIORITIES: dict[str, dict[str, int]] = {
+    "game_planner": {"lesson_plan": 50, "prior_feedback": 80},
+    "design_evaluator": {"lesson_plan": 40, "rubric": 90, "game_design_doc": 100},
+    "implementation_planner": {"lesson_plan": 40, "template_code": 70, "game_design_doc": 90},
+    "game_coder": {
+        "implementation_plan": 60, "template_code": 70, "game_design_doc": 50,
+        "existing_code": 100, "playtest_report": 80, "errors": 90,
+    },
+    "game_player": {"lesson_plan": 30, "game_design_doc": 50, "review": 70, "game_code": 100, "runtime_results": 90},
+}
+
+SECTION_KINDS = {
+    "template_code": "code",
+    "existing_code": "code",
+    "game_code": "code",
+    "lesson_plan": "json",
+}
+
+BLOCK_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+HTML_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+# Only whole-line // comments, so URLs and strings containing // survive
+LINE_COMMENT_RE = re.compile(r"^[ \t]*//[^\n]*\n", re.MULTILINE)
+BLANK_LINES_RE = re.compile(r"\n[ \t]*\n(?:[ \t]*\n)+")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _strip_code(text: str) -> str:
+    text = HTML_COMMENT_RE.sub("", text)
+    text = BLOCK_COMMENT_RE.sub("", text)
+    text = LINE_COMMENT_RE.sub("", text)
+    return BLANK_LINES_RE.sub("\n\n", text)
+
+
+def _compact_json(text: str) -> str:
+    try:
+        return json.dumps(json.loads(text), separators=(",", ":"), ensure_ascii=False)
+    except (ValueError, TypeError):
+        return _dedupe_text(text)
+
+
+def _dedupe_text(text: str) -> str:
+    """Collapse consecutive repeated lines and runs of blank lines; fenced code blocks are left alone."""
+    out = []
+    previous = None
+    in_fence = False
+    for line in text.splitlines():
+        key = line.strip()
+        if key.startswith("```"):
+            in_fence = not in_fence
+            previous = None
+        elif not in_fence:
+            if key and key == previous:
+                continue
+            previous = key
+        out.append(line.rstrip())
+    return BLANK_LINES_RE.sub("\n\n", "\n".join(out))
+
+
+def compact(name: str, text: str) -> str:
+    """Apply the cleanup step for a section's kind."""
+    kind = SECTION_KINDS.get(name, "text")
+    if kind == "code":
+        return _strip_code(text)
+    if kind == "json":
+        return _compact_json(text)
+    return _dedupe_text(text)
+
+
+def truncate_middle(text: str, max_tokens: int) -> str:
+    """Keep the head and tail of text within max_tokens, marking the cut."""
+    max_chars = max(0, max_tokens * CHARS_PER_TOKEN)
+    if len(text) <= max_chars:
+        return text
+    omitted = len(text) - max_chars
+    marker = f"\n\n[... {omitted} chars omitted to fit the prompt budget ...]\n\n"
+    head = max(0, (max_chars - len(marker)) * 2 // 3)
+    tail = max(0, max_chars - len(marker) - head)
+    return text[:head] + marker + (text[-tail:] if tail else "")
+
+
+def _format_sizes(sizes: dict[str, int]) -> str:
+    return " ".join(f"{k}={v / 1000:.1f}k" for k, v in sorted(sizes.items(), key=lambda kv: -kv[1]))
+
+
+def _resize(sizes: dict[str, int], name: str, text: str, total: int) -> int:
+    """Record the new size of a section and return the updated total."""
+    new = estimate_tokens(text)
+    total += new - sizes[name]
+    sizes[name] = new
+    return total
+
+
+def fit_to_budget(node_name: str, variables: dict, budget: int | None = None, protected: tuple[str, ...] = ()) -> dict:
+    """Return a copy of variables whose prioritized sections fit the node's token budget.
+
+    Args:
+        node_name: Node whose priorities and budget apply.
+        variables: Template variables about to be rendered.
+        budget: Token budget; defaults to settings.prompt_budgets[node_name].
+        protected: Variables that must be passed through unchanged.
+    """
+    priorities = SECTION_PRIORITIES.get(node_name, {})
+    if budget is None:
+        budget = settings.prompt_budgets.get(node_name)
+
+    out = dict(variables)
+    sizes = {k: estimate_tokens(v) for k, v in out.items() if isinstance(v, str)}
+    total = sum(sizes.values())
+    before = dict(sizes)
+
+    if budget and total > budget:
+        candidates = sorted(
+            (k for k in priorities if k in sizes and k not in protected),
+            key=lambda k: priorities[k],
+        )
+
+        # Pass 1: cleanup, lowest priority first
+        for name in candidates:
+            if total <= budget:
+                break
+            out[name] = compact(name, out[name])
+            total = _resize(sizes, name, out[name], total)
+
+        # Pass 2: truncate, lowest priority first; code is never cut
+        for name in candidates:
+            if total <= budget:
+                break
+            if SECTION_KINDS.get(name) == "code":
+                continue
+            allowed = max(0, sizes[name] - (total - budget))
+            out[name] = truncate_middle(out[name], allowed)
+            total = _resize(sizes, name, out[name], total)
+
+    changed = {k: f"{before[k] / 1000:.1f}k→{sizes[k] / 1000:.1f}k" for k in sizes if sizes[k] != before[k]}
+    budget_str = f"{budget / 1000:.0f}k" if budget else "∞"
+    log.info(f"[dim]Prompt budget[/dim] | {node_name} | {total / 1000:.1f}k/{budget_str} tokens | {_format_sizes(sizes)}")
+    if changed:
+        log.info(f"[dim]Prompt budget[/dim] | {node_name} | compacted: {changed}")
+    return out
@@ -1,10 +1,27 @@
-"""Prompt template loading and rendering via Jinja2."""
+"""Prompt and game template registry.
 
+Every file in prompts/ and templates/ is read once and kept in memory;
+prompts are also precompiled as Jinja2 templates. Nodes call
+load_prompt / render_template / load_game_template on every invocation,
+so none of them touch the disk on the hot path.
+
+With settings.prompt_hot_reload enabled (dev), files are re-read when
+their mtime changes, so prompt edits take effect without a restart.
+"""
+
+from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
+
+from jinja2 import Environment, FileSystemLoader, Template
 
-from jinja2 import Environment, FileSystemLoader
+from utils.config import settings
+from utils.logger import get_logger
+
+log = get_logger("prompts")
 
 PROMPTS_DIR = Path(__file__).resolve().parent.parent / "prompts"
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
 
 _env = Environment(
     loader=FileSystemLoader(str(PROMPTS_DIR)),
@@ -12,13 +29,85 @@ _env = Environment(
 )
 
 
+@dataclass(frozen=True)
+class _Entry:
+    text: str
+    mtime: float
+    compiled: Template | None = None
+
+
+class PromptRegistry:
+    """Immutable in-memory snapshot of prompts/ and templates/.
+
+    Args:
+        hot_reload: Re-read a file when its mtime changes.
+    """
+
+    def __init__(self, hot_reload: bool = False):
+        self.hot_reload = hot_reload
+        self._prompts: MappingProxyType = MappingProxyType({})
+        self._templates: MappingProxyType = MappingProxyType({})
+        self._loaded = False
+
+    def load(self) -> None:
+        """Read and compile every prompt and game template."""
+        prompts = {}
+        for path in sorted(PROMPTS_DIR.glob("*.md")):
+            prompts[path.name] = self._read(path, compile=True)
+        templates = {}
+        for path in sorted(TEMPLATES_DIR.glob("*.html")):
+            templates[path.stem] = self._read(path, compile=False)
+
+        self._prompts = MappingProxyType(prompts)
+        self._templates = MappingProxyType(templates)
+        self._loaded = True
+        log.info(f"Loaded {len(prompts)} prompts and {len(templates)} game templates")
+
+    @staticmethod
+    def _read(path: Path, compile: bool) -> _Entry:
+        text = path.read_text()
+        return _Entry(
+            text=text,
+            mtime=path.stat().st_mtime,
+            compiled=_env.from_string(text) if compile else None,
+        )
+
+    def _get(self, table: str, key: str, path: Path, compile: bool) -> _Entry:
+        if not self._loaded:
+            self.load()
+        entries = getattr(self, table)
+        entry = entries.get(key)
+        if entry is None:
+            raise FileNotFoundError(path)
+
+        if self.hot_reload:
+            mtime = path.stat().st_mtime
+            if mtime != entry.mtime:
+                log.info(f"[dim]Reloading {path.name}[/dim]")
+                entry = self._read(path, compile)
+                setattr(self, table, MappingProxyType({**entries, key: entry}))
+        return entry
+
+    def prompt(self, filename: str) -> _Entry:
+        return self._get("_prompts", filename, PROMPTS_DIR / filename, compile=True)
+
+    def game_template(self, game_type: str) -> str:
+        return self._get("_templates", game_type, TEMPLATES_DIR / f"{game_type}.html", compile=False).text
+
+
+registry = PromptRegistry(hot_reload=settings.prompt_hot_reload)
+
+
 def load_prompt(filename: str) -> str:
     """Load a raw prompt file from the prompts/ directory."""
-    filepath = PROMPTS_DIR / filename
-    return filepath.read_text()
+    return registry.prompt(filename).text
 
 
 def render_template(filename: str, variables: dict) -> str:
     """Render a Jinja2 prompt template with the given variables."""
-    template = _env.get_template(filename)
-    return template.render(**variables)
+    return registry.prompt(filename).compiled.render(**variables)
+
+
+def load_game_template(game_type: str) -> str:
+    """Load the HTML template for the given game type."""
+    return registry.game_template(game_type)
@@ -1,11 +1,27 @@
-"""Supabase client for updating game status in the games table."""
+"""Supabase client for updating game status in the games table.
 
+Inside the server, updates go through a write-behind queue: repeated
+updates to the same game are merged into one PATCH and flushed on a
+short interval (or straight away for a terminal status) from a
+background task, so nodes never block the event loop on the network.
+Without a running writer (e.g. the CLI) updates are written directly.
+"""
+
+import asyncio
 import os
+from postgrest.exceptions import APIError
 from supabase import create_client, Client
+
+from utils.config import settings
 from utils.logger import get_logger
 
 log = get_logger("supabase")
 
+TERMINAL_STATUSES = {"done", "failed"}
+RETRYABLE_HTTP_STATUSES = {408, 429}
+# Postgres SQLSTATE classes for connection loss, rollbacks, overload and shutdown
+RETRYABLE_SQLSTATE_CLASSES = {"08", "40", "53", "57"}
+
 _client: Client | None = None
 
 
@@ -21,13 +37,169 @@ def get_supabase_client() -> Client:
     return _client
 
 
+def _write_game(game_id: str, data: dict) -> None:
+    """Blocking PATCH of one games row."""
+    client = get_supabase_client()
+    log.info(f"[blue]Supabase[/blue] | updating game {game_id}: {list(data.keys())}")
+    client.table("games").update(data).eq("id", game_id).execute()
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether a failed PATCH may succeed if sent again unchanged.
+
+    PostgREST reports HTTP statuses for non-JSON responses and Postgres
+    SQLSTATEs otherwise; only outages, overload and timeouts are worth
+    retrying. Bad columns, bad values or auth errors never will be.
+    """
+    if isinstance(error, APIError):
+        code = str(error.code or "")
+        if len(code) == 3 and code.isdigit():
+            status = int(code)
+            return status >= 500 or status in RETRYABLE_HTTP_STATUSES
+        # PGRST0xx are PostgREST's database-connection errors
+        return code.startswith("PGRST0") or code[:2] in RETRYABLE_SQLSTATE_CLASSES
+    # Missing credentials and the like
+    if isinstance(error, (RuntimeError, ValueError, TypeError)):
+        return False
+    return True  # network errors
+
+
+class GameWriter:
+    """Background writer that coalesces and batches games-table updates.
+
+    Each game is written by its own task, so one failing game backing
+    off never delays another game's update. An update that still fails
+    after max_retries is put back in the queue, at most max_requeues
+    times; non-retryable errors are dropped at once. Either way the
+    drop is logged at error level.
+
+    Args:
+        flush_interval_s: Longest an update waits before being written.
+        max_retries: Attempts per flush before an update is put back in the queue.
+        backoff_s: Base delay for exponential backoff between attempts.
+        max_requeues: Flushes an update may fail before it is dropped.
+    """
+
+    def __init__(self, flush_interval_s: float, max_retries: int, backoff_s: float, max_requeues: int = 5):
+        self.flush_interval_s = flush_interval_s
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.max_requeues = max_requeues
+        self._pending: dict[str, dict] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._requeues: dict[str, int] = {}
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="supabase-writer")
+
+    async def stop(self) -> None:
+        """Stop the flush loop and drain everything still queued or in flight."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def enqueue(self, game_id: str, data: dict) -> None:
+        """Merge an update into the pending PATCH for game_id."""
+        self._pending.setdefault(game_id, {}).update(data)
+        if data.get("status") in TERMINAL_STATUSES and self._wake is not None:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            self._start_writes()
+
+    def _start_writes(self) -> None:
+        """Start a write task for every pending game that has none in flight."""
+        for game_id in list(self._pending):
+            # One write per game at a time keeps its updates in order; the rest waits
+            if game_id in self._inflight:
+                continue
+            data = self._pending.pop(game_id)
+            task = asyncio.create_task(self._write_with_retry(game_id, data), name=f"supabase-write-{game_id}")
+            self._inflight[game_id] = task
+            task.add_done_callback(lambda _, gid=game_id: self._write_done(gid))
+
+    def _write_done(self, game_id: str) -> None:
+        self._inflight.pop(game_id, None)
+        # Updates that arrived during the write go out now rather than next interval
+        if game_id in self._pending and self._wake is not None:
+            self._wake.set()
+
+    async def flush(self) -> None:
+        """Write every pending update, one merged PATCH per game, and wait for all writes."""
+        while self._pending or self._inflight:
+            self._start_writes()
+            await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+
+    async def _write_with_retry(self, game_id: str, data: dict) -> None:
+        try:
+            for attempt in range(self.max_retries):
+                try:
+                    await asyncio.to_thread(_write_game, game_id, data)
+                    self._requeues.pop(game_id, None)
+                    return
+                except Exception as e:
+                    if not _is_retryable(e):
+                        log.error(f"[red]Supabase[/red] | dropping update for {game_id} ({list(data.keys())}): non-retryable error: {e}")
+                        self._requeues.pop(game_id, None)
+                        return
+                    delay = self.backoff_s * 2 ** attempt
+                    log.warning(f"[yellow]Supabase[/yellow] | update for {game_id} failed (attempt {attempt + 1}/{self.max_retries}): {e}")
+                    await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            # Interrupted mid-write or in backoff; the final flush in stop() drains it
+            self._requeue(game_id, data)
+            raise
+
+        requeues = self._requeues.get(game_id, 0) + 1
+        if requeues > self.max_requeues:
+            log.error(f"[red]Supabase[/red] | dropping update for {game_id} ({list(data.keys())}) after {self.max_requeues} failed flushes")
+            self._requeues.pop(game_id, None)
+            return
+        self._requeues[game_id] = requeues
+        log.error(f"[red]Supabase[/red] | giving up on update for {game_id} this flush; requeueing ({requeues}/{self.max_requeues})")
+        self._requeue(game_id, data)
+
+    def _requeue(self, game_id: str, data: dict) -> None:
+        """Put an unwritten update back underneath anything newer so the next flush retries it."""
+        self._pending[game_id] = {**data, **self._pending.get(game_id, {})}
+
+
+writer = GameWriter(
+    flush_interval_s=settings.supabase_flush_interval_s,
+    max_retries=settings.supabase_max_retries,
+    backoff_s=settings.supabase_backoff_s,
+    max_requeues=settings.supabase_max_requeues,
+)
+
+
 def update_game(game_id: str, data: dict) -> None:
     """Update a row in the games table by ID.
 
+    Queued on the background writer when it is running, otherwise
+    written immediately.
+
     Args:
         game_id: UUID of the game row.
         data: Dict of column names to values to update.
     """
-    client = get_supabase_client()
-    log.info(f"[blue]Supabase[/blue] | updating game {game_id}: {list(data.keys())}")
-    client.table("games").update(data).eq("id", game_id).execute()
+    if writer.running:
+        writer.enqueue(game_id, data)
+    else:
+        _write_game(game_id, data)
@@ -0,0 +1,87 @@
+"""Shared agentic tool-calling loop for nodes that give the LLM tools.
+
+All tool calls from one model turn run concurrently; sync tools (e.g.
+the Chroma-backed search_kaplay_docs) run in a worker thread so they
+never block the event loop. Each call has a timeout, and failures are
+returned to the model as error ToolMessages instead of aborting the
+node.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import BaseTool
+
+from utils.config import settings
+from utils.logger import get_logger
+
+log = get_logger("tool_loop")
+
+
+async def _call_tool(tool: BaseTool, args: dict):
+    if getattr(tool, "coroutine", None) is not None:
+        return await tool.ainvoke(args)
+    return await asyncio.to_thread(tool.invoke, args)
+
+
+async def run_tool_call(call: dict, tools_by_name: dict[str, BaseTool], timeout_s: float, color: str = "cyan") -> ToolMessage:
+    """Execute one tool call and wrap its result (or error) in a ToolMessage."""
+    name = call["name"]
+    tool = tools_by_name.get(name)
+    start = time.perf_counter()
+    status = "success"
+    if tool is None:
+        output, status = f"Unknown tool: {name}", "error"
+    else:
+        try:
+            output = await asyncio.wait_for(_call_tool(tool, call["args"]), timeout=timeout_s)
+        except asyncio.TimeoutError:
+            output, status = f"Tool {name} timed out after {timeout_s:.0f}s", "error"
+        except Exception as e:
+            output, status = f"Tool {name} failed: {e}", "error"
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    log.info(f"[{color}]  ↳ tool call:[/{color}] {name}({call['args']}) — {elapsed_ms:.0f} ms{'' if status == 'success' else ' [red]' + status + '[/red]'}")
+    return ToolMessage(content=str(output), tool_call_id=call["id"], status=status)
+
+
+async def run_tool_loop(
+    invoke: Callable[[list], Awaitable[AIMessage]],
+    messages: list,
+    tools: list[BaseTool],
+    max_rounds: int = 5,
+    timeout_s: float | None = None,
+    color: str = "cyan",
+) -> AIMessage:
+    """Let the LLM call tools until it produces a final text response.
+
+    Args:
+        invoke: Runs one model turn on the message list (ainvoke, or a
+            streaming wrapper around astream).
+        messages: Conversation so far; tool turns are appended in place.
+        tools: Tools bound to the model.
+        max_rounds: Maximum model turns.
+        timeout_s: Per-call timeout; defaults to settings.tool_timeout_s.
+        color: Rich color for the tool-call log lines.
+
+    Returns:
+        The last model response.
+    """
+    tools_by_name = {t.name: t for t in tools}
+    timeout_s = settings.tool_timeout_s if timeout_s is None else timeout_s
+
+    for _ in range(max_rounds):
+        response = await invoke(messages)
+        messages.append(response)
+
+        if not response.tool_calls:
+            break
+
+        results = await asyncio.gather(*(
+            run_tool_call(call, tools_by_name, timeout_s, color) for call in response.tool_calls
+        ))
+        messages.extend(results)
+
+    return response